@@ -0,0 +1,560 @@
+# automation/core.py
+"""
+Shared driver for the RSS and YouTube pipelines.
+A Source finds new items and downloads their audio; Pipeline runs every
+source through transcription, translation, summary, tagging, metadata,
+Notion push and the seen-episode bookkeeping.
+"""
+
+import os
+import re
+import json
+import sys
+import pathlib
+import queue
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+
+# Make "scripts" and "utils" importable
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+
+# Whisper, Claude and Notion modules are imported inside the stage functions
+# that use them, so cron runs with no new episodes start in well under a second
+from utils.cost_tracker import CostTracker
+from utils import seen_store
+from utils.json_utils import atomic_write_json
+
+DATA = ROOT / "data"
+AUDIO_DIR = DATA / "audio"
+TRANS_DIR = DATA / "transcripts"
+SUM_DIR = DATA / "summaries"
+
+# Stage workers log concurrently: each line is one write under _LOG_LOCK, and
+# inside log_block() a thread's lines are held back and written as one block
+_LOG_LOCK = threading.Lock()
+_log_local = threading.local()
+
+class _BlockStdout:
+    """
+    sys.stdout stand-in used while Pipeline.run is active: print() output of
+    the scripts a stage calls joins that thread's log block, if any
+    """
+
+    def __init__(self, stream):
+        self.stream = stream
+
+    def write(self, text):
+        block = getattr(_log_local, "block", None)
+        if block is not None:
+            block.append(text)
+        else:
+            _emit(text)
+        return len(text)
+
+    def flush(self):
+        self.stream.flush()
+
+    def __getattr__(self, name):
+        return getattr(self.stream, name)
+
+def _emit(text: str):
+    out = sys.stdout
+    stream = out.stream if isinstance(out, _BlockStdout) else out
+    with _LOG_LOCK:
+        stream.write(text)
+
+def log_with_timestamp(message: str):
+    """Print message with timestamp for cron logs"""
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    line = f"[{timestamp}] {message}\n"
+    block = getattr(_log_local, "block", None)
+    if block is not None:
+        block.append(line)
+    else:
+        _emit(line)
+
+@contextmanager
+def log_block(header: str = None):
+    """
+    Hold this thread's log lines until the block ends, then write them together,
+    so one feed's "== feed ==", Skipping/Audio and ERROR lines stay adjacent in
+    cron.log (evals/processing_stats.py credits them to the header above).
+    With header, a non-empty block starts with its own "== header ==" line.
+    """
+    if getattr(_log_local, "block", None) is not None:
+        yield
+        return
+    _log_local.block = []
+    try:
+        if header:
+            log_with_timestamp(f"== {header} ==")
+        yield
+    finally:
+        lines, _log_local.block = _log_local.block, None
+        if len(lines) > (1 if header else 0):
+            _emit("".join(lines))
+
+# Static tag-generator instructions, sent as a cached system block so repeated
+# calls within the cache TTL can reuse the prefix (caching is a no-op below the
+# model's minimum cacheable length, so this never costs more than before)
+TAG_SYSTEM_PROMPT = (
+    "You are a precise tag generator. Read the podcast summary and return ONLY a JSON array "
+    "of concise topical tags. Each tag should be 1-3 words, no emojis, no punctuation. "
+    "Avoid generic words like podcast or episode. Focus on themes, domains, or concrete topics.\n\n"
+    "Return JSON only, like: [\"AI coding tools\", \"developer productivity\", \"Apple Watch\"]\n\n"
+    "When given several numbered summaries, return ONLY a JSON array containing one tag array "
+    "per summary, in the same order, like: [[\"AI coding tools\"], [\"Apple Watch\"]]"
+)
+
+# Rough Claude tokenizer ratio for English prose (same estimate as CostTracker)
+CHARS_PER_TOKEN = 4
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Cut text to about max_tokens, backing off to the last whitespace so no word is split"""
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    if len(text) <= max_chars:
+        return text
+    cut = max(text.rfind(" ", 0, max_chars), text.rfind("\n", 0, max_chars))
+    return text[:cut if cut > max_chars // 2 else max_chars]
+
+def collect_summary(summary_path: str) -> str:
+    """Read a summary file, truncated to TAG_MAX_TOKENS (default 1500) for tagging"""
+    max_tokens = int(os.getenv("TAG_MAX_TOKENS", "1500"))
+    with open(summary_path, "r", encoding="utf-8") as f:
+        return truncate_to_tokens(f.read(), max_tokens)
+
+def _request_tags(client, tag_model: str, prompt: str, max_tokens: int):
+    """Send one tagging request, retrying on 429. Returns the response or None."""
+    from utils.rate_limits import create_message
+    try:
+        return create_message(
+            client,
+            model=tag_model,
+            max_tokens=max_tokens,
+            system=[{
+                "type": "text",
+                "text": TAG_SYSTEM_PROMPT,
+                "cache_control": {"type": "ephemeral"},
+            }],
+            messages=[{"role": "user", "content": prompt}],
+        )
+    except Exception as e:
+        print("Auto-tagging failed:", e)
+        return None
+
+def _log_tag_cost(cost_tracker, tag_model: str, usage, episode_name: str, share: int = 1):
+    """Log tagging cost; share > 1 splits a batched request evenly across episodes"""
+    cost_tracker.log_claude_cost(
+        tag_model,
+        usage.input_tokens // share,
+        usage.output_tokens // share,
+        "Auto-tagging",
+        episode_name,
+        cache_read_tokens=(getattr(usage, "cache_read_input_tokens", 0) or 0) // share,
+        cache_write_tokens=(getattr(usage, "cache_creation_input_tokens", 0) or 0) // share,
+    )
+
+def generate_auto_tags_from_summary(summary_path: str, max_tags: int = 6, cost_tracker=None, episode_name="") -> list[str]:
+    """
+    Reads the SUMMARY file and asks Claude for concise topical tags.
+    Rate-limit friendly: truncates input and retries on 429.
+    Uses ANTHROPIC_TAG_MODEL if set (default: claude-haiku-3-20240307).
+    """
+    api_key = os.getenv("ANTHROPIC_API_KEY")
+    if not api_key:
+        print("No ANTHROPIC_API_KEY set, skipping auto-tagging")
+        return []
+
+    tag_model = os.getenv("ANTHROPIC_TAG_MODEL", "claude-3-5-haiku-20241022")
+
+    try:
+        text = collect_summary(summary_path)
+        from utils.rate_limits import get_client
+        client = get_client(api_key)
+
+        prompt = (
+            f"Return {max(3, min(max_tags, 6))} tags for this summary.\n\n"
+            "Summary:\n\n" + text
+        )
+
+        resp = _request_tags(client, tag_model, prompt, max_tokens=150)
+        if resp is None:
+            return []
+        raw = resp.content[0].text.strip()
+
+        # Track tagging cost if cost_tracker provided
+        if cost_tracker and hasattr(resp, 'usage'):
+            _log_tag_cost(cost_tracker, tag_model, resp.usage, episode_name)
+
+        try:
+            arr = json.loads(raw)
+            if isinstance(arr, list):
+                return [str(t).strip() for t in arr if str(t).strip()]
+        except Exception:
+            return [t.strip() for t in raw.split(",") if t.strip()]
+    except Exception as e:
+        print("Auto-tagging failed:", e)
+
+    return []
+
+def generate_auto_tags_batch(summary_paths: list[str], max_tags: int = 6):
+    """
+    Tags several summaries with a single Claude request.
+    Returns (tag lists in input order, usage), or (None, None) if the batch
+    failed or the reply did not contain one tag array per summary.
+    """
+    api_key = os.getenv("ANTHROPIC_API_KEY")
+    if not api_key or not summary_paths:
+        return None, None
+
+    tag_model = os.getenv("ANTHROPIC_TAG_MODEL", "claude-3-5-haiku-20241022")
+
+    try:
+        texts = [collect_summary(p) for p in summary_paths]
+        from utils.rate_limits import get_client
+        client = get_client(api_key)
+
+        prompt = (
+            f"Return {max(3, min(max_tags, 6))} tags for each of the {len(texts)} summaries below.\n\n"
+            + "\n\n".join(f"Summary {i}:\n\n{text}" for i, text in enumerate(texts, 1))
+        )
+
+        resp = _request_tags(client, tag_model, prompt, max_tokens=150 * len(texts))
+        if resp is None:
+            return None, None
+
+        arr = json.loads(resp.content[0].text.strip())
+        if not isinstance(arr, list) or len(arr) != len(texts) or not all(isinstance(a, list) for a in arr):
+            print("Batch auto-tagging returned an unexpected shape")
+            return None, None
+
+        tag_lists = [[str(t).strip() for t in tags if str(t).strip()] for tags in arr]
+        return tag_lists, resp.usage
+    except Exception as e:
+        print("Batch auto-tagging failed:", e)
+        return None, None
+
+def tag_pending_episodes(pending: list[dict], cost_tracker, max_tags: int = 6) -> None:
+    """
+    Fill pending[i]["auto_tags"] for every summarised episode of this run.
+    Uses one batched request; falls back to per-episode calls if it fails.
+    Each record carries its own cost session in pending[i]["costs"].
+    """
+    if not pending:
+        return
+
+    tag_model = os.getenv("ANTHROPIC_TAG_MODEL", "claude-3-5-haiku-20241022")
+    tag_lists, usage = None, None
+    if len(pending) > 1:
+        tag_lists, usage = generate_auto_tags_batch([p["out_path"] for p in pending], max_tags=max_tags)
+
+    for i, record in enumerate(pending):
+        cost_tracker.session_costs = record["costs"]
+        if tag_lists is not None:
+            record["auto_tags"] = tag_lists[i]
+            _log_tag_cost(cost_tracker, tag_model, usage, record["title"], share=len(pending))
+        else:
+            record["auto_tags"] = generate_auto_tags_from_summary(
+                record["out_path"], max_tags=max_tags,
+                cost_tracker=cost_tracker, episode_name=record["title"]
+            )
+    cost_tracker.session_costs = []
+
+# Processed episode ids live in data/seen.sqlite (see utils.seen_store); the
+# connection is opened on first use and shared by the feed workers
+_SEEN_DB = None
+_SEEN_LOCK = threading.Lock()
+
+
+_SLUG_RE = re.compile(r"[^A-Za-z0-9._-]+")
+
+
+def slugify(s: str) -> str:
+    return _SLUG_RE.sub("_", s).strip("_")[:120]
+
+
+def _seen_db():
+    global _SEEN_DB
+    if _SEEN_DB is None:
+        _SEEN_DB = seen_store.open_seen_db(DATA)
+    return _SEEN_DB
+
+
+def is_seen(name: str, episode_id: str) -> bool:
+    with _SEEN_LOCK:
+        return seen_store.is_seen(_seen_db(), name, episode_id)
+
+
+def mark_seen(name: str, episode_id: str) -> None:
+    """Record an episode id; the insert is committed immediately"""
+    with _SEEN_LOCK:
+        seen_store.mark_seen(_seen_db(), name, episode_id)
+
+
+_STAGE_DONE = object()
+
+
+def run_stages(items: list, stages: list) -> list:
+    """
+    Push items through (stage_name, func, workers) stages connected by queues,
+    so stage k of one episode overlaps stage k+1 of the previous one.
+    workers may be a callable; it is called only once an item reaches the
+    stage, so a stage nothing reaches (e.g. transcription when every episode
+    is already seen) never imports or probes what sizing it needs.
+    A stage returning None (or raising) drops the item.
+    Returns the outputs of the last stage.
+    """
+    queues = [queue.Queue() for _ in range(len(stages) + 1)]
+    for item in items:
+        queues[0].put(item)
+
+    def process(stage_name, func, ctx, q_out):
+        label = (ctx.get("title") or ctx.get("name")) if isinstance(ctx, dict) else ctx
+        # An item's lines for this stage, error included, go out as one block,
+        # under its feed's header again once stages overlap other feeds
+        header = ctx.get("log_header") if isinstance(ctx, dict) else None
+        with log_block(header):
+            try:
+                ctx = func(ctx)
+            except Exception as e:
+                log_with_timestamp(f"ERROR: {stage_name} stage failed for {label}: {e}")
+                ctx = None
+        if ctx is not None:
+            q_out.put(ctx)
+
+    def worker(stage_name, func, q_in, q_out):
+        while True:
+            ctx = q_in.get()
+            if ctx is _STAGE_DONE:
+                # Pass the sentinel on to this stage's other workers
+                q_in.put(ctx)
+                return
+            process(stage_name, func, ctx, q_out)
+
+    def stage(stage_name, func, workers, q_in, q_out):
+        ctx = q_in.get()
+        if ctx is _STAGE_DONE:
+            return
+        if callable(workers):
+            try:
+                workers = workers()
+            except Exception as e:
+                log_with_timestamp(f"ERROR: could not size {stage_name} stage: {e}")
+                workers = 1
+        helpers = [
+            threading.Thread(target=worker, args=(stage_name, func, q_in, q_out), daemon=True)
+            for _ in range(workers - 1)
+        ]
+        for t in helpers:
+            t.start()
+        process(stage_name, func, ctx, q_out)
+        worker(stage_name, func, q_in, q_out)
+        for t in helpers:
+            t.join()
+
+    threads = []
+    for k, (stage_name, func, workers) in enumerate(stages):
+        t = threading.Thread(target=stage, args=(stage_name, func, workers, queues[k], queues[k + 1]),
+                             daemon=True)
+        t.start()
+        threads.append(t)
+
+    # Stage k's input is complete once every stage k-1 worker has exited
+    for k, t in enumerate(threads):
+        queues[k].put(_STAGE_DONE)
+        t.join()
+
+    results = []
+    while not queues[-1].empty():
+        results.append(queues[-1].get())
+    return results
+
+
+class Source:
+    """
+    Where a pipeline's items come from. Subclasses implement items() and
+    fetch(); the rest of the processing is shared by Pipeline.
+    """
+
+    # Banner used in "=== ... started/completed ===" log lines
+    title = "Pipeline"
+    # Noun used in the per-item cost log line
+    noun = "Episode"
+    # Threads for the download and summarise stages
+    workers = 1
+    # Mark an item as seen even when the Notion push fails
+    ignore_notion_errors = False
+
+    def items(self) -> list:
+        """Return the work items (feeds, URLs, ...) for this run"""
+        raise NotImplementedError
+
+    def fetch(self, item, cost_tracker: CostTracker):
+        """
+        Stage 1: resolve an item, skip it if already seen and download its audio.
+        Returns an episode context with at least seen_key, episode_id, title,
+        cost_label, log_header (the "== ... ==" line fetch logged), mp3_path
+        and costs, or None to skip the item.
+        """
+        raise NotImplementedError
+
+    def build_meta(self, record: dict) -> dict:
+        """Return the .meta.json contents for a finished record (auto tags in record["auto_tags"])"""
+        raise NotImplementedError
+
+
+def transcribe_episode(ctx: dict, cost_tracker: CostTracker) -> dict:
+    """Stage 2: transcribe the downloaded audio"""
+    from scripts.transcribe import load_model, transcribe_with
+    cost_tracker.session_costs = ctx["costs"]
+
+    # 2) Transcribe
+    txt_path, audio_duration = transcribe_with(load_model("small"), ctx["mp3_path"], str(TRANS_DIR))
+    log_with_timestamp(f"Transcript: {txt_path} ({audio_duration:.1f} min)")
+
+    # Track Whisper cost
+    cost_tracker.log_whisper_cost(audio_duration, ctx["title"])
+
+    ctx["txt_path"] = txt_path
+    return ctx
+
+
+def summarise_episode(ctx: dict, cost_tracker: CostTracker) -> dict:
+    """
+    Stage 3: translate if needed and summarise.
+    Returns the pending record for Pipeline.finish.
+    """
+    from scripts.translate import is_english, translate_transcript
+    from scripts.summarise_with_quotes import summarise_with_sonnet
+
+    cost_tracker.session_costs = ctx["costs"]
+    txt_path = ctx["txt_path"]
+
+    # 3) Translate if needed
+    # English transcripts skip translation after a quick check on a few
+    # windows of the file (middle, start and end)
+    if is_english(txt_path):
+        final_txt_path, translation_usage = txt_path, None
+    else:
+        final_txt_path, translation_usage = translate_transcript(txt_path, str(TRANS_DIR))
+    if final_txt_path != txt_path:
+        log_with_timestamp(f"Translation: {final_txt_path}")
+        if translation_usage:
+            cost_tracker.log_claude_cost(
+                "claude-3-5-haiku-20241022",
+                translation_usage.input_tokens,
+                translation_usage.output_tokens,
+                "Translation",
+                ctx["title"]
+            )
+
+    # 4) Summarise with Sonnet (very long transcripts are condensed with Haiku first)
+    def log_notes_cost(model, usage):
+        cost_tracker.log_claude_cost(
+            model, usage.input_tokens, usage.output_tokens, "Summary notes", ctx["title"]
+        )
+
+    out_path, summary_usage = summarise_with_sonnet(final_txt_path, str(SUM_DIR), log_notes_cost)
+    log_with_timestamp(f"Summary: {out_path}")
+    if summary_usage:
+        cost_tracker.log_claude_cost(
+            "claude-sonnet-4-20250514",
+            summary_usage.input_tokens,
+            summary_usage.output_tokens,
+            "Summary",
+            ctx["title"]
+        )
+
+    ctx["out_path"] = out_path
+    return ctx
+
+
+class Pipeline:
+    """Runs a Source's items through every processing stage"""
+
+    def __init__(self, source: Source):
+        self.source = source
+        self.cost_tracker = CostTracker()
+
+    def finish(self, record: dict) -> None:
+        """Save metadata, push to Notion, log the item's cost and mark it as seen"""
+        from scripts.push_to_notion import main as push_to_notion_main
+
+        cost_tracker = self.cost_tracker
+        out_path = record["out_path"]
+        cost_tracker.session_costs = record["costs"]
+
+        # 5) Save metadata (static tags merged with this run's auto tags)
+        meta = self.source.build_meta(record)
+        meta_path = out_path.replace("_summary.txt", "_summary.meta.json")
+        atomic_write_json(meta_path, meta, indent=False)
+        log_with_timestamp(f"Meta saved: {meta_path}")
+
+        # 6) Push to Notion
+        try:
+            push_to_notion_main([out_path])
+        except Exception as e:
+            if not self.source.ignore_notion_errors:
+                raise
+            log_with_timestamp(f"WARNING: Failed to push to Notion: {e}")
+
+        # Log episode cost total
+        total_cost = cost_tracker.log_episode_total(record["cost_label"])
+        if total_cost:
+            log_with_timestamp(f"{self.source.noun} cost: ${total_cost:.3f}")
+
+        # Mark as seen
+        mark_seen(record["seen_key"], record["episode_id"])
+        log_with_timestamp("Marked as processed.")
+
+    def run(self) -> None:
+        # print() output of the scripts a stage calls joins that stage's log
+        # block, so it lands under the right feed header too
+        stdout = sys.stdout
+        sys.stdout = _BlockStdout(stdout)
+        try:
+            self._run()
+        finally:
+            sys.stdout = stdout
+
+    def _run(self) -> None:
+        source = self.source
+        cost_tracker = self.cost_tracker
+        log_with_timestamp(f"=== {source.title} started ===")
+
+        items = source.items()
+        if not items:
+            return
+
+        # Overlap stages across items: downloads and Claude calls run on
+        # source.workers threads each, while one transcription worker per Whisper
+        # replica (one per GPU, else one) keeps Whisper busy. Claude calls are
+        # throttled via utils.rate_limits.anthropic_slot.
+        def transcribe_workers():
+            from scripts.transcribe import transcribe_workers
+            return transcribe_workers()
+
+        pending = run_stages(items, [
+            ("download", lambda item: source.fetch(item, cost_tracker), source.workers),
+            ("transcribe", lambda ctx: transcribe_episode(ctx, cost_tracker), transcribe_workers),
+            ("summarise", lambda ctx: summarise_episode(ctx, cost_tracker), source.workers),
+        ])
+
+        # Tag every new summary in one Claude call, then finish each item
+        try:
+            tag_pending_episodes(pending, cost_tracker, max_tags=6)
+        except Exception as e:
+            log_with_timestamp(f"WARNING: Auto-tagging failed: {e}")
+
+        for record in pending:
+            with log_block(record.get("log_header")):
+                try:
+                    self.finish(record)
+                except Exception as e:
+                    log_with_timestamp(f"ERROR: Failed to finish {record['title']}: {e}")
+
+        # Print cost summary at the end
+        log_with_timestamp("\n" + cost_tracker.get_summary())
+        log_with_timestamp(f"=== {source.title} completed ===")
@@ -1,187 +1,24 @@
 # automation/youtube_pipeline.py
 
-import os
-import re
-import json
 import sys
 import pathlib
-import time
-from datetime import datetime
 
-# Make "scripts" and "utils" importable
+# Make "automation", "scripts" and "utils" importable
 ROOT = pathlib.Path(__file__).resolve().parents[1]
 sys.path.append(str(ROOT))
 
+from automation.core import (
+    AUDIO_DIR, Pipeline, Source, is_seen, log_with_timestamp, slugify,
+)
 from scripts.download_youtube import download_youtube_audio
-from scripts.extract_youtube_metadata import get_youtube_metadata
-from scripts.transcribe import transcribe_file
-from scripts.translate import translate_transcript
-from scripts.summarise_with_quotes import summarise_with_sonnet
-from scripts.push_to_notion import main as push_to_notion_main
+from scripts.extract_youtube_metadata import get_youtube_metadata, youtube_id_from_url
 from utils.cost_tracker import CostTracker
 from utils.date_utils import to_iso_date
 
-# Import auto-tagging function from main pipeline
-from automation.pipeline import generate_auto_tags_from_summary, log_with_timestamp
-
-DATA = ROOT / "data"
-AUDIO_DIR = DATA / "audio"
-TRANS_DIR = DATA / "transcripts"
-SUM_DIR = DATA / "summaries"
 YOUTUBE_LINKS_FILE = ROOT / "config" / "youtube_links.txt"
-SEEN_FILE = DATA / "seen.json"
-
-
-def slugify(s: str) -> str:
-    return re.sub(r"[^A-Za-z0-9._-]+", "_", s).strip("_")[:120]
-
-
-def load_seen() -> dict:
-    if SEEN_FILE.exists():
-        with open(SEEN_FILE, "r", encoding="utf-8") as f:
-            return json.load(f)
-    return {}
-
-
-def save_seen(seen: dict) -> None:
-    SEEN_FILE.parent.mkdir(parents=True, exist_ok=True)
-    with open(SEEN_FILE, "w", encoding="utf-8") as f:
-        json.dump(seen, f, indent=2)
-
-
-# Removed: Now using utils.date_utils.to_iso_date()
-
-
-def process_youtube_video(url: str, cost_tracker: CostTracker) -> None:
-    """Process a single YouTube video through the pipeline"""
-
-    log_with_timestamp(f"== Processing YouTube video ==")
-    log_with_timestamp(f"URL: {url}")
-
-    # 1) Extract metadata first
-    try:
-        metadata = get_youtube_metadata(url)
-    except Exception as e:
-        log_with_timestamp(f"ERROR: Failed to extract metadata: {e}")
-        return
-
-    video_id = metadata.get("id")
-    title = metadata.get("title", "Untitled")
-    channel = metadata.get("channel", "Unknown Channel")
-
-    # Convert upload date to ISO format
-    upload_date = metadata.get("upload_date", "")
-    if upload_date:
-        try:
-            upload_date = to_iso_date(upload_date)
-        except ValueError:
-            log_with_timestamp(f"Warning: Could not parse date '{upload_date}', using as-is")
-
-    log_with_timestamp(f"Video: {title}")
-    log_with_timestamp(f"Channel: {channel}")
-    log_with_timestamp(f"Published: {upload_date}")
-
-    # Check if already processed
-    seen = load_seen()
-    youtube_key = "YouTube"
-    seen_ids = set(seen.get(youtube_key, []))
-
-    if video_id in seen_ids:
-        log_with_timestamp(f"Skipping. Already processed: {title}")
-        return
-
-    # 2) Download audio
-    base = f"{slugify(channel)}__{slugify(title)}"
-    try:
-        mp3_path = download_youtube_audio(url, str(AUDIO_DIR), base)
-        log_with_timestamp(f"Audio: {mp3_path}")
-    except Exception as e:
-        log_with_timestamp(f"ERROR: Failed to download audio: {e}")
-        return
-
-    # 3) Transcribe
-    try:
-        txt_path, audio_duration = transcribe_file(mp3_path, str(TRANS_DIR), model_size="small")
-        log_with_timestamp(f"Transcript: {txt_path} ({audio_duration:.1f} min)")
-
-        # Track Whisper cost
-        cost_tracker.log_whisper_cost(audio_duration, title)
-    except Exception as e:
-        log_with_timestamp(f"ERROR: Failed to transcribe: {e}")
-        return
-
-    # 4) Translate if needed
-    try:
-        final_txt_path, translation_usage = translate_transcript(txt_path, str(TRANS_DIR))
-        if final_txt_path != txt_path:
-            log_with_timestamp(f"Translation: {final_txt_path}")
-            if translation_usage:
-                cost_tracker.log_claude_cost(
-                    "claude-3-5-haiku-20241022",
-                    translation_usage.input_tokens,
-                    translation_usage.output_tokens,
-                    "Translation",
-                    title
-                )
-    except Exception as e:
-        log_with_timestamp(f"ERROR: Failed to translate: {e}")
-        return
-
-    # 5) Summarise with Sonnet
-    try:
-        out_path, summary_usage = summarise_with_sonnet(final_txt_path, str(SUM_DIR))
-        log_with_timestamp(f"Summary: {out_path}")
-        if summary_usage:
-            cost_tracker.log_claude_cost(
-                "claude-sonnet-4-20250514",
-                summary_usage.input_tokens,
-                summary_usage.output_tokens,
-                "Summary",
-                title
-            )
-    except Exception as e:
-        log_with_timestamp(f"ERROR: Failed to summarize: {e}")
-        return
-
-    # 6) Generate auto tags from the summary
-    try:
-        auto_tags = generate_auto_tags_from_summary(out_path, max_tags=6, cost_tracker=cost_tracker, episode_name=title)
-        combined_tags = sorted(set(["YouTube", "video"] + (auto_tags or [])))
-    except Exception as e:
-        log_with_timestamp(f"WARNING: Auto-tagging failed: {e}")
-        combined_tags = ["YouTube", "video"]
-
-    # 7) Save metadata
-    meta = {
-        "podcast": channel,  # Channel name as "podcast"
-        "episode": title,
-        "published": upload_date,
-        "link": metadata.get("url"),
-        "tags": combined_tags,
-        "source": "YouTube"
-    }
-    meta_path = out_path.replace("_summary.txt", "_summary.meta.json")
-    with open(meta_path, "w", encoding="utf-8") as mf:
-        json.dump(meta, mf, indent=2)
-    log_with_timestamp(f"Meta saved: {meta_path}")
-
-    # 8) Push to Notion
-    try:
-        sys.argv = ["push_to_notion.py", out_path]
-        push_to_notion_main()
-    except Exception as e:
-        log_with_timestamp(f"WARNING: Failed to push to Notion: {e}")
-
-    # Log episode cost total
-    total_cost = cost_tracker.log_episode_total(f"{channel}: {title}")
-    if total_cost:
-        log_with_timestamp(f"Video cost: ${total_cost:.3f}")
-
-    # Mark as seen
-    seen_ids.add(video_id)
-    seen[youtube_key] = list(seen_ids)
-    save_seen(seen)
-    log_with_timestamp("Marked as processed.")
+YOUTUBE_KEY = "YouTube"
+# Per-video "== ... ==" log header
+LOG_HEADER = "Processing YouTube video"
 
 
 def read_youtube_links() -> list[str]:
@@ -202,33 +39,95 @@ def read_youtube_links() -> list[str]:
     return urls
 
 
-def main():
-    log_with_timestamp("=== YouTube video processing pipeline started ===")
+class YouTubeSource(Source):
+    """Videos listed in config/youtube_links.txt, processed one at a time in file order"""
 
-    # Initialize cost tracker
-    cost_tracker = CostTracker()
+    title = "YouTube video processing pipeline"
+    noun = "Video"
+    workers = 1
+    # A failed Notion push still marks the video as processed
+    ignore_notion_errors = True
 
-    # Read URLs from file
-    urls = read_youtube_links()
+    def items(self) -> list:
+        urls = read_youtube_links()
 
-    if not urls:
-        log_with_timestamp(f"No URLs found in {YOUTUBE_LINKS_FILE}")
-        log_with_timestamp("Add YouTube URLs (one per line) and run again.")
-        return
+        if not urls:
+            log_with_timestamp(f"No URLs found in {YOUTUBE_LINKS_FILE}")
+            log_with_timestamp("Add YouTube URLs (one per line) and run again.")
+            return []
 
-    log_with_timestamp(f"Found {len(urls)} URL(s) to process")
+        log_with_timestamp(f"Found {len(urls)} URL(s) to process")
+        return urls
 
-    # Process each URL
-    for url in urls:
-        try:
-            process_youtube_video(url, cost_tracker)
-        except Exception as e:
-            log_with_timestamp(f"ERROR: Failed to process {url}: {e}")
-            continue
+    def fetch(self, url: str, cost_tracker: CostTracker):
+        """
+        Stage 1: resolve video metadata and download the audio.
+        Returns an episode context for the next stages, or None if skipped.
+        """
+        log_with_timestamp(f"== {LOG_HEADER} ==")
+        log_with_timestamp(f"URL: {url}")
+
+        # Check the id parsed from the URL first to skip the metadata round trip
+        url_video_id = youtube_id_from_url(url)
+        if url_video_id and is_seen(YOUTUBE_KEY, url_video_id):
+            log_with_timestamp(f"Skipping. Already processed: {url_video_id}")
+            return
+
+        # 1) Extract metadata
+        metadata = get_youtube_metadata(url)
 
-    # Print cost summary at the end
-    log_with_timestamp("\n" + cost_tracker.get_summary())
-    log_with_timestamp("=== YouTube video processing pipeline completed ===")
+        video_id = metadata.get("id")
+        title = metadata.get("title", "Untitled")
+        channel = metadata.get("channel", "Unknown Channel")
+
+        # Convert upload date to ISO format
+        upload_date = metadata.get("upload_date", "")
+        if upload_date:
+            try:
+                upload_date = to_iso_date(upload_date)
+            except ValueError:
+                log_with_timestamp(f"Warning: Could not parse date '{upload_date}', using as-is")
+
+        log_with_timestamp(f"Video: {title}")
+        log_with_timestamp(f"Channel: {channel}")
+        log_with_timestamp(f"Published: {upload_date}")
+
+        # Check if already processed (for URL forms we could not parse)
+        if is_seen(YOUTUBE_KEY, video_id):
+            log_with_timestamp(f"Skipping. Already processed: {title}")
+            return
+
+        # 2) Download audio
+        base = f"{slugify(channel)}__{slugify(title)}"
+        mp3_path = download_youtube_audio(url, str(AUDIO_DIR), base)
+        log_with_timestamp(f"Audio: {mp3_path}")
+
+        return {
+            "seen_key": YOUTUBE_KEY,
+            "episode_id": video_id,
+            "title": title,
+            "cost_label": f"{channel}: {title}",
+            "log_header": LOG_HEADER,
+            "channel": channel,
+            "upload_date": upload_date,
+            "url": metadata.get("url"),
+            "mp3_path": mp3_path,
+            "costs": [],
+        }
+
+    def build_meta(self, record: dict) -> dict:
+        return {
+            "podcast": record["channel"],  # Channel name as "podcast"
+            "episode": record["title"],
+            "published": record["upload_date"],
+            "link": record["url"],
+            "tags": sorted(set(["YouTube", "video"] + (record.get("auto_tags") or []))),
+            "source": "YouTube"
+        }
+
+
+def main():
+    Pipeline(YouTubeSource()).run()
 
 
 if __name__ == "__main__":
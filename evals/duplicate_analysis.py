@@ -1,27 +1,60 @@
 #!/usr/bin/env python3
 """
 Duplicate Detection Analysis
-Analyzes seen.json file for potential duplicate processing issues
+Analyzes the seen-episode database for potential duplicate processing issues
 Usage: python3 evals/duplicate_analysis.py [--cleanup]
 """
 
-import json
 import sys
 from pathlib import Path
 from datetime import datetime
 from collections import defaultdict, Counter
 import difflib
+from operator import itemgetter
 
-def analyze_seen_file(seen_file: Path) -> dict:
-    """Analyze the seen.json file for potential issues"""
-    if not seen_file.exists():
-        return {"error": "seen.json not found"}
-    
+# Add project root to path for imports
+sys.path.insert(0, str(Path(__file__).parents[1]))
+
+from utils import seen_store
+
+try:
+    # Optional: C++ fuzzy matching, much faster than difflib for large seen databases
+    import numpy as np
+    from rapidfuzz import fuzz, process
+except ImportError:
+    process = None
+
+try:
+    # Optional: MinHash-LSH candidate search for very large seen databases
+    from datasketch import MinHash, MinHashLSH
+except ImportError:
+    MinHashLSH = None
+
+try:
+    # Optional: vectorized string checks for analyze_episode_patterns
+    import pandas as pd
+except ImportError:
+    pd = None
+
+SIMILARITY_THRESHOLD = 0.85
+
+# Above this many unique IDs per feed, bucket by MinHash-LSH instead of scoring
+# every pair. The LSH Jaccard threshold is looser than SIMILARITY_THRESHOLD so
+# pairs with a high edit ratio but lower shingle overlap still become candidates.
+LSH_MIN_EPISODES = 5000
+LSH_THRESHOLD = 0.5
+LSH_NUM_PERM = 64
+
+def analyze_seen_file(data_dir: Path) -> dict:
+    """Analyze the seen-episode database for potential issues"""
     try:
-        with open(seen_file, 'r', encoding='utf-8') as f:
-            seen_data = json.load(f)
+        seen_db = seen_store.open_seen_db(data_dir, create=False)
+        if seen_db is None:
+            return {"error": "seen.sqlite not found"}
+        seen_data = seen_store.load_all(seen_db)
+        seen_db.close()
     except Exception as e:
-        return {"error": f"Failed to read seen.json: {e}"}
+        return {"error": f"Failed to read seen.sqlite: {e}"}
     
     analysis = {
         "total_feeds": len(seen_data),
@@ -107,30 +140,128 @@ def analyze_feed_episodes(feed_name: str, episodes: list) -> dict:
 
 def find_similar_episodes(episodes: list) -> list:
     """Find episodes with similar IDs that might be duplicates"""
+    # Convert once, deduplicating at the string level, so the pairwise
+    # search below never calls str() itself
+    unique_episodes = list({str(episode) for episode in episodes})
+    if len(unique_episodes) < 2:
+        return []
+
+    if MinHashLSH is not None and len(unique_episodes) >= LSH_MIN_EPISODES:
+        return _find_similar_lsh(unique_episodes)
+    if process is not None:
+        return _find_similar_rapidfuzz(unique_episodes)
+    return _find_similar_difflib(unique_episodes)
+
+def _find_similar_lsh(unique_episodes: list) -> list:
+    """Near-linear search: MinHash-LSH over character 3-shingles, then confirm candidates"""
+    ep_strs = unique_episodes
+    lsh = MinHashLSH(threshold=LSH_THRESHOLD, num_perm=LSH_NUM_PERM)
+    signatures = []
+    for i, ep in enumerate(ep_strs):
+        m = MinHash(num_perm=LSH_NUM_PERM)
+        shingles = {ep[k:k + 3] for k in range(len(ep) - 2)} or {ep}
+        m.update_batch([sh.encode("utf-8") for sh in shingles])
+        lsh.insert(i, m)
+        signatures.append(m)
+
     similar_pairs = []
-    unique_episodes = list(set(episodes))
-    
-    for i, ep1 in enumerate(unique_episodes):
-        for ep2 in unique_episodes[i+1:]:
-            # Skip if episodes are identical
-            if ep1 == ep2:
+    for i, m in enumerate(signatures):
+        for j in lsh.query(m):
+            if j <= i:
+                continue
+            if process is not None:
+                similarity = fuzz.ratio(ep_strs[i], ep_strs[j]) / 100
+            else:
+                similarity = difflib.SequenceMatcher(None, ep_strs[i], ep_strs[j]).ratio()
+            if similarity > SIMILARITY_THRESHOLD:
+                similar_pairs.append({
+                    "episode1": unique_episodes[i],
+                    "episode2": unique_episodes[j],
+                    "similarity": similarity
+                })
+
+    return similar_pairs
+
+def _find_similar_rapidfuzz(unique_episodes: list) -> list:
+    """Score all pairs at once with rapidfuzz.process.cdist"""
+    ep_strs = unique_episodes
+    cutoff = SIMILARITY_THRESHOLD * 100
+    scores = process.cdist(ep_strs, ep_strs, scorer=fuzz.ratio,
+                           score_cutoff=cutoff, workers=-1)
+
+    # Upper triangle only: each pair once, skip self-matches on the diagonal
+    rows, cols = np.nonzero(np.triu(scores, 1) > cutoff)
+    return [
+        {
+            "episode1": unique_episodes[i],
+            "episode2": unique_episodes[j],
+            "similarity": float(scores[i, j]) / 100
+        }
+        for i, j in zip(rows, cols)
+    ]
+
+def _find_similar_difflib(unique_episodes: list) -> list:
+    """Pure-Python fallback: pairwise SequenceMatcher with cheap upper bounds"""
+    similar_pairs = []
+    ep_strs = unique_episodes
+
+    for i, s1 in enumerate(ep_strs):
+        matcher = difflib.SequenceMatcher(None, b=s1)
+        for j in range(i + 1, len(ep_strs)):
+            s2 = ep_strs[j]
+            # Length bound: ratio can never exceed 2*min/(len1+len2)
+            if 2 * min(len(s1), len(s2)) / (len(s1) + len(s2)) <= SIMILARITY_THRESHOLD:
+                continue
+
+            matcher.set_seq1(s2)
+            if matcher.quick_ratio() <= SIMILARITY_THRESHOLD:
                 continue
-            
-            # Calculate similarity ratio
-            similarity = difflib.SequenceMatcher(None, str(ep1), str(ep2)).ratio()
-            
+
             # Flag as suspicious if very similar (but not identical)
-            if similarity > 0.85:
+            similarity = matcher.ratio()
+            if similarity > SIMILARITY_THRESHOLD:
                 similar_pairs.append({
-                    "episode1": ep1,
-                    "episode2": ep2, 
+                    "episode1": unique_episodes[i],
+                    "episode2": unique_episodes[j],
                     "similarity": similarity
                 })
-    
+
     return similar_pairs
 
 def analyze_episode_patterns(episodes: list) -> dict:
     """Analyze patterns in episode IDs"""
+    eps = [str(episode) for episode in episodes]
+    if pd is not None:
+        return _analyze_patterns_pandas(eps)
+    return _analyze_patterns_python(eps)
+
+def _analyze_patterns_pandas(eps: list) -> dict:
+    """Same checks as the Python loop, done with pandas .str accessors"""
+    s = pd.Series(eps, dtype="string")
+    lengths = s.str.len().to_numpy(dtype=int)
+    numeric = s.str.isdigit().to_numpy(dtype=bool)
+    has_alpha = s.str.contains(r"[^\W\d_]", regex=True).to_numpy(dtype=bool)
+
+    patterns = {
+        "numeric_only": int(numeric.sum()),
+        "contains_url": int(s.str.contains("http", case=False, regex=False).sum()),
+        "contains_title": int((has_alpha & ~numeric).sum()),
+        "very_short_ids": int((lengths < 10).sum()),  # Less than 10 chars
+        "very_long_ids": int((lengths > 200).sum()),  # More than 200 chars
+        "common_prefixes": [],
+        "id_lengths": lengths.tolist()
+    }
+
+    # Find common prefixes among reasonably long IDs
+    if len(eps) > 1:
+        prefix_counts = s[lengths >= 10].str[:10].value_counts()
+        prefix_counts = prefix_counts[prefix_counts > 1]
+        patterns["common_prefixes"] = [(prefix, int(count)) for prefix, count in prefix_counts.items()]
+
+    return patterns
+
+def _analyze_patterns_python(eps: list) -> dict:
+    """Pure-Python fallback when pandas is not installed"""
     patterns = {
         "numeric_only": 0,
         "contains_url": 0,
@@ -141,19 +272,19 @@ def analyze_episode_patterns(episodes: list) -> dict:
         "id_lengths": []
     }
     
-    for episode in episodes:
-        ep_str = str(episode)
+    for ep_str in eps:
         length = len(ep_str)
+        numeric = ep_str.isdigit()
         patterns["id_lengths"].append(length)
         
         # Check patterns
-        if ep_str.isdigit():
+        if numeric:
             patterns["numeric_only"] += 1
         
         if "http" in ep_str.lower():
             patterns["contains_url"] += 1
         
-        if any(char.isalpha() for char in ep_str) and not ep_str.isdigit():
+        if any(char.isalpha() for char in ep_str) and not numeric:
             patterns["contains_title"] += 1
         
         if length < 10:
@@ -162,17 +293,16 @@ def analyze_episode_patterns(episodes: list) -> dict:
             patterns["very_long_ids"] += 1
     
     # Find common prefixes
-    if len(episodes) > 1:
+    if len(eps) > 1:
         prefixes = defaultdict(int)
-        for episode in episodes:
-            ep_str = str(episode)
-            if len(ep_str) >= 10:  # Only analyze reasonably long IDs
+        for ep_str, length in zip(eps, patterns["id_lengths"]):
+            if length >= 10:  # Only analyze reasonably long IDs
                 prefix = ep_str[:10]
                 prefixes[prefix] += 1
         
         # Keep prefixes that appear multiple times
         common_prefixes = [(prefix, count) for prefix, count in prefixes.items() if count > 1]
-        patterns["common_prefixes"] = sorted(common_prefixes, key=lambda x: x[1], reverse=True)
+        patterns["common_prefixes"] = sorted(common_prefixes, key=itemgetter(1), reverse=True)
     
     return patterns
 
@@ -195,7 +325,7 @@ def find_cross_feed_duplicates(seen_data: dict) -> list:
                 "feed_count": len(feeds)
             })
     
-    return sorted(duplicates, key=lambda x: x["feed_count"], reverse=True)
+    return sorted(duplicates, key=itemgetter("feed_count"), reverse=True)
 
 def generate_cleanup_suggestions(analysis: dict) -> list:
     """Generate specific cleanup suggestions"""
@@ -223,11 +353,11 @@ def generate_cleanup_suggestions(analysis: dict) -> list:
     
     return suggestions
 
-def main():
-    cleanup_mode = "--cleanup" in sys.argv
+def main(argv: list = None):
+    argv = sys.argv[1:] if argv is None else argv
+    cleanup_mode = "--cleanup" in argv
     
     project_root = Path(__file__).parents[1]
-    seen_file = project_root / "data" / "seen.json"
     
     print("🔍 Duplicate Detection Analysis")
     print("=" * 50)
@@ -235,7 +365,7 @@ def main():
     print()
     
     # Analyze seen file
-    analysis = analyze_seen_file(seen_file)
+    analysis = analyze_seen_file(project_root / "data")
     
     if "error" in analysis:
         print(f"❌ {analysis['error']}")
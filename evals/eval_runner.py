@@ -5,13 +5,93 @@ Runs all evaluation scripts and logs results to dedicated files
 Usage: python3 evals/eval_runner.py [--daily|--weekly|--monthly]
 """
 
+import importlib
+import io
+import re
 import sys
-import subprocess
-import json
+import threading
+import traceback
+import logging
+from collections import deque
+from contextlib import contextmanager
+from logging.handlers import RotatingFileHandler
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
 from typing import Dict, Any
 
+# Evaluation scripts are imported by module name from this directory
+sys.path.insert(0, str(Path(__file__).parent))
+sys.path.insert(1, str(Path(__file__).parents[1]))
+
+from utils.json_utils import dumps_json, loads_json
+
+# All metrics extract_summary_data looks for, as one alternation so each
+# eval output is scanned once. Group names are summary keys.
+_SUMMARY_RE = re.compile(
+    r'Total feeds: (?P<feeds_checked>\d+)'
+    r'|Healthy: (?P<feeds_healthy>\d+)'
+    r'|With warnings: (?P<feeds_with_warnings>\d+)'
+    r'|Unhealthy: (?P<feeds_unhealthy>\d+)'
+    r'|Total episodes analyzed: (?P<episodes_analyzed>\d+)'
+    r'|Total issues found: (?P<quality_issues>\d+)'
+    r'|Average summary length: (?P<avg_summary_length>\d+)'
+    r'|Success rate: (?P<processing_success_rate>[\d.]+)%'
+    r'|Found (?P<duplicates_found>\d+) potential issues'
+)
+
+# Size and backup count for the rotating eval_<name>.log files
+LOG_MAX_BYTES = 1 << 20
+LOG_BACKUPS = 5
+
+# eval_summary.jsonl is append-only; once it grows past SUMMARY_ROTATE_BYTES
+# it is trimmed back to the last SUMMARY_MAX_ENTRIES lines
+SUMMARY_MAX_ENTRIES = 100
+SUMMARY_ROTATE_BYTES = 256 * 1024
+
+# Keys each eval section may set; duplicate_analysis.py also prints "Total feeds:"
+_SUMMARY_SECTIONS = {
+    'health': {'feeds_checked', 'feeds_healthy', 'feeds_with_warnings', 'feeds_unhealthy'},
+    'quality': {'episodes_analyzed', 'quality_issues', 'avg_summary_length'},
+    'performance': {'processing_success_rate'},
+    'duplicates': {'duplicates_found'},
+}
+
+# Script and description for each evaluation
+_EVAL_SCRIPTS = {
+    'health': ('feed_health.py', 'RSS Feed Health Check'),
+    'quality': ('quality_check.py', 'Content Quality Analysis'),
+    'performance': ('processing_stats.py', 'Processing Performance Analysis'),
+    'duplicates': ('duplicate_analysis.py', 'Duplicate Detection Analysis'),
+}
+
+# (evaluation, args) per mode, in run order; daily runs skip duplicates
+_EVAL_CONFIGS = {
+    'daily': (
+        ('health', ()),
+        ('quality', ('--recent', '10')),
+        ('performance', ('--days', '1')),
+    ),
+    'weekly': (
+        ('health', ('--verbose',)),
+        ('quality', ()),
+        ('performance', ('--days', '7')),
+        ('duplicates', ()),
+    ),
+    'monthly': (
+        ('health', ('--verbose',)),
+        ('quality', ()),
+        ('performance', ('--days', '30')),
+        ('duplicates', ()),
+    ),
+    'manual': (
+        ('health', ()),
+        ('quality', ()),
+        ('performance', ('--days', '30')),
+        ('duplicates', ()),
+    ),
+}
+
 class EvalLogger:
     """Handles logging evaluation results to dedicated files"""
     
@@ -25,71 +105,166 @@ class EvalLogger:
             'quality': logs_dir / 'eval_quality.log', 
             'performance': logs_dir / 'eval_performance.log',
             'duplicates': logs_dir / 'eval_duplicates.log',
-            'summary': logs_dir / 'eval_summary.json'
+            'summary': logs_dir / 'eval_summary.jsonl'
         }
+        # Text logs rotate at LOG_MAX_BYTES, keeping LOG_BACKUPS old files
+        # (eval_health.log.1 ...). Each evaluation is written as one record.
+        self.loggers = {}
+        for eval_type, path in self.log_files.items():
+            if eval_type == 'summary':
+                continue
+            handler = RotatingFileHandler(path, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUPS,
+                                          encoding='utf-8', delay=True)
+            handler.terminator = ''
+            logger = logging.getLogger(f'eval_runner.{eval_type}')
+            for old in logger.handlers[:]:
+                logger.removeHandler(old)
+                old.close()
+            logger.addHandler(handler)
+            logger.setLevel(logging.INFO)
+            logger.propagate = False
+            self.loggers[eval_type] = logger
+        self._migrate_legacy_summary()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+    
+    def close(self):
+        """Flush and close the log handlers"""
+        for logger in self.loggers.values():
+            for handler in logger.handlers[:]:
+                logger.removeHandler(handler)
+                handler.close()
+        self.loggers.clear()
+    
+    def _migrate_legacy_summary(self):
+        """Convert an old eval_summary.json list into eval_summary.jsonl once"""
+        legacy = self.logs_dir / 'eval_summary.json'
+        if not legacy.exists() or self.log_files['summary'].exists():
+            return
+        try:
+            summaries = loads_json(legacy.read_bytes())
+        except (OSError, ValueError):
+            return
+        with open(self.log_files['summary'], 'wb') as f:
+            f.writelines(dumps_json(entry, indent=False) + b'\n' for entry in summaries[-SUMMARY_MAX_ENTRIES:])
+        legacy.unlink()
     
     def log_evaluation(self, eval_type: str, output: str, status: str = 'success'):
         """Log evaluation results with timestamp"""
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         
-        log_file = self.log_files.get(eval_type)
-        if not log_file:
+        logger = self.loggers.get(eval_type)
+        if not logger:
             return
         
-        # Write to dedicated log file
-        with open(log_file, 'a', encoding='utf-8') as f:
-            f.write(f"\n{'='*60}\n")
-            f.write(f"[{timestamp}] {eval_type.upper()} EVALUATION - {status.upper()}\n")
-            f.write('='*60 + '\n')
-            f.write(output)
-            f.write('\n')
+        # Write to dedicated log file as one block
+        logger.info(
+            f"\n{'='*60}\n"
+            f"[{timestamp}] {eval_type.upper()} EVALUATION - {status.upper()}\n"
+            f"{'='*60}\n"
+            f"{output}\n"
+        )
     
     def log_summary(self, summary_data: Dict[str, Any]):
         """Log summary data as JSON for easy parsing"""
         timestamp = datetime.now().isoformat()
         
-        # Load existing summaries
-        summaries = []
-        if self.log_files['summary'].exists():
-            try:
-                with open(self.log_files['summary'], 'r') as f:
-                    summaries = json.load(f)
-            except:
-                summaries = []
-        
-        # Add new summary
+        # Append one line instead of rewriting the whole history
         summary_data['timestamp'] = timestamp
-        summaries.append(summary_data)
-        
-        # Keep only last 100 entries
-        summaries = summaries[-100:]
+        with open(self.log_files['summary'], 'ab') as f:
+            f.write(dumps_json(summary_data, indent=False) + b'\n')
         
-        # Save back
-        with open(self.log_files['summary'], 'w') as f:
-            json.dump(summaries, f, indent=2)
+        self._maybe_rotate()
+    
+    def _maybe_rotate(self):
+        """Trim the summary log to the last SUMMARY_MAX_ENTRIES lines once it gets large"""
+        path = self.log_files['summary']
+        if path.stat().st_size <= SUMMARY_ROTATE_BYTES:
+            return
+        with open(path, 'r') as f:
+            recent = deque(f, maxlen=SUMMARY_MAX_ENTRIES)
+        with open(path, 'w') as f:
+            f.writelines(recent)
 
-def run_evaluation(script_name: str, args: list = None) -> tuple[str, str, int]:
-    """Run an evaluation script and capture output"""
-    project_root = Path(__file__).parents[1]
-    script_path = project_root / "evals" / script_name
+class _ThreadStdout:
+    """
+    sys.stdout/sys.stderr stand-in that sends each thread's writes to that
+    thread's capture buffer (if any), so evaluations can run concurrently in-process
+    """
+    
+    def __init__(self, stream):
+        self._stream = stream
+        self._local = threading.local()
+    
+    def capture(self, buffer):
+        self._local.buffer = buffer
+    
+    def release(self):
+        self._local.buffer = None
     
-    cmd = ["python3", str(script_path)]
-    if args:
-        cmd.extend(args)
+    def _target(self):
+        return getattr(self._local, 'buffer', None) or self._stream
     
+    def write(self, text):
+        return self._target().write(text)
+    
+    def flush(self):
+        self._target().flush()
+    
+    def __getattr__(self, name):
+        return getattr(self._stream, name)
+
+_streams_lock = threading.Lock()
+_streams_users = 0
+_saved_streams = None
+
+@contextmanager
+def _thread_streams():
+    """
+    Make sys.stdout and sys.stderr _ThreadStdout proxies while any caller is
+    inside; the first caller installs them and the last restores the originals
+    """
+    global _streams_users, _saved_streams
+    with _streams_lock:
+        if _streams_users == 0:
+            _saved_streams = sys.stdout, sys.stderr
+            sys.stdout = _ThreadStdout(sys.stdout)
+            sys.stderr = _ThreadStdout(sys.stderr)
+        _streams_users += 1
     try:
-        result = subprocess.run(
-            cmd, 
-            capture_output=True, 
-            text=True, 
-            cwd=str(project_root),
-            timeout=120  # 2 minute timeout
-        )
-        return result.stdout, result.stderr, result.returncode
-    except subprocess.TimeoutExpired:
-        return "", "Evaluation timed out after 2 minutes", 1
-    except Exception as e:
-        return "", f"Failed to run evaluation: {e}", 1
+        yield
+    finally:
+        with _streams_lock:
+            _streams_users -= 1
+            if _streams_users == 0:
+                sys.stdout, sys.stderr = _saved_streams
+
+def run_evaluation(script_name: str, args: list = None) -> tuple[str, str, int]:
+    """
+    Run an evaluation script's main() in this interpreter and capture its
+    stdout and stderr.
+    Shares imports (feedparser, requests session, ...) with the other evaluations.
+    """
+    out, err = io.StringIO(), io.StringIO()
+    with _thread_streams():
+        sys.stdout.capture(out)
+        sys.stderr.capture(err)
+        try:
+            module = importlib.import_module(Path(script_name).stem)
+            module.main(list(args or []))
+            return out.getvalue(), err.getvalue(), 0
+        except SystemExit as e:
+            code = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+            return out.getvalue(), err.getvalue() + ("" if code == 0 else str(e.code)), code
+        except Exception:
+            return out.getvalue(), err.getvalue() + f"Failed to run evaluation: {traceback.format_exc()}", 1
+        finally:
+            sys.stdout.release()
+            sys.stderr.release()
 
 def extract_summary_data(outputs: Dict[str, str]) -> Dict[str, Any]:
     """Extract key metrics from evaluation outputs for summary logging"""
@@ -106,42 +281,18 @@ def extract_summary_data(outputs: Dict[str, str]) -> Dict[str, Any]:
         'total_issues': 0
     }
     
-    # Extract health data
-    if 'health' in outputs:
-        health_output = outputs['health']
-        import re
-        
-        # Parse health summary
-        if match := re.search(r'Total feeds: (\d+)', health_output):
-            summary['feeds_checked'] = int(match.group(1))
-        if match := re.search(r'Healthy: (\d+)', health_output):
-            summary['feeds_healthy'] = int(match.group(1))
-        if match := re.search(r'With warnings: (\d+)', health_output):
-            summary['feeds_with_warnings'] = int(match.group(1))
-        if match := re.search(r'Unhealthy: (\d+)', health_output):
-            summary['feeds_unhealthy'] = int(match.group(1))
-    
-    # Extract quality data
-    if 'quality' in outputs:
-        quality_output = outputs['quality']
-        if match := re.search(r'Total episodes analyzed: (\d+)', quality_output):
-            summary['episodes_analyzed'] = int(match.group(1))
-        if match := re.search(r'Total issues found: (\d+)', quality_output):
-            summary['quality_issues'] = int(match.group(1))
-        if match := re.search(r'Average summary length: (\d+)', quality_output):
-            summary['avg_summary_length'] = int(match.group(1))
-    
-    # Extract performance data
-    if 'performance' in outputs:
-        performance_output = outputs['performance']
-        if match := re.search(r'Success rate: ([\d.]+)%', performance_output):
-            summary['processing_success_rate'] = float(match.group(1))
-    
-    # Extract duplicate data
-    if 'duplicates' in outputs:
-        duplicates_output = outputs['duplicates']
-        if match := re.search(r'Found (\d+) potential issues', duplicates_output):
-            summary['duplicates_found'] = int(match.group(1))
+    # One pass per section output; like re.search, the first match of each metric wins
+    found = set()
+    for section, keys in _SUMMARY_SECTIONS.items():
+        if section not in outputs:
+            continue
+        for match in _SUMMARY_RE.finditer(outputs[section]):
+            key = match.lastgroup
+            if key not in keys or key in found:
+                continue
+            found.add(key)
+            value = match.group(key)
+            summary[key] = float(value) if key == 'processing_success_rate' else int(value)
     
     # Calculate total issues
     summary['total_issues'] = (
@@ -167,42 +318,23 @@ def main():
     print(f"Timestamp: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     print()
     
-    # Define evaluation configurations
-    evaluations = {
-        'health': {
-            'script': 'feed_health.py',
-            'args': ['--verbose'] if mode in ['weekly', 'monthly'] else [],
-            'description': 'RSS Feed Health Check'
-        },
-        'quality': {
-            'script': 'quality_check.py', 
-            'args': ['--recent', '10'] if mode == 'daily' else [],
-            'description': 'Content Quality Analysis'
-        },
-        'performance': {
-            'script': 'processing_stats.py',
-            'args': ['--days', '1'] if mode == 'daily' else ['--days', '7'] if mode == 'weekly' else ['--days', '30'],
-            'description': 'Processing Performance Analysis'
-        },
-        'duplicates': {
-            'script': 'duplicate_analysis.py',
-            'args': [],
-            'description': 'Duplicate Detection Analysis'
-        }
-    }
-    
-    # Skip some evaluations for daily runs
-    if mode == 'daily':
-        evaluations.pop('duplicates', None)  # Skip duplicates for daily
+    evaluations = _EVAL_CONFIGS[mode]
     
     results = {}
     outputs = {}
     
-    # Run each evaluation
-    for eval_name, config in evaluations.items():
-        print(f"🔄 Running {config['description']}...")
-        
-        stdout, stderr, returncode = run_evaluation(config['script'], config['args'])
+    # Run every evaluation at once in this interpreter (they are independent).
+    # The stream proxies go in before any worker starts, so they all share them
+    waits = {}
+    with _thread_streams(), ThreadPoolExecutor(max_workers=max(1, len(evaluations))) as executor:
+        for eval_name, args in evaluations:
+            script, description = _EVAL_SCRIPTS[eval_name]
+            print(f"🔄 Running {description}...")
+            waits[eval_name] = executor.submit(run_evaluation, script, args)
+    
+    # Report results in configuration order
+    for eval_name, waited in waits.items():
+        stdout, stderr, returncode = waited.result()
         
         if returncode == 0:
             print(f"✅ {eval_name} completed")
@@ -225,11 +357,12 @@ def main():
     # Extract and log summary data
     summary_data = extract_summary_data(outputs)
     summary_data['mode'] = mode
-    summary_data['evaluations_run'] = list(evaluations.keys())
+    summary_data['evaluations_run'] = [eval_name for eval_name, _ in evaluations]
     summary_data['success_count'] = sum(1 for r in results.values() if r['status'] == 'success')
     summary_data['total_evaluations'] = len(results)
     
     logger.log_summary(summary_data)
+    logger.close()
     
     # Display summary
     print("\n" + "=" * 50)
@@ -259,7 +392,7 @@ def main():
         print(f"\n⚠️  Total issues found: {total_issues}")
     
     print(f"\n📁 Results logged to: logs/eval_*.log")
-    print(f"📊 Summary data: logs/eval_summary.json")
+    print(f"📊 Summary data: logs/eval_summary.jsonl")
     
     # Show recent log file locations
     print("\n📋 Log Files:")
@@ -159,28 +159,34 @@ def explain_warning(warning_type: str):
     
     print()
 
+# Detection rules in priority order: the first rule whose keywords all
+# appear in the warning text wins. Add new warning types here.
+_WARNING_RULES = (
+    (('parse', 'date'), 'date_parsing'),
+    (('days old',), 'old_episodes'),
+    (('mp3', 'missing'), 'missing_mp3'),
+    (('title', 'missing'), 'missing_title'),
+    (('http',), 'feed_errors'),
+    (('connection',), 'feed_errors'),
+    (('duplicate',), 'duplicates'),
+    (('success rate',), 'performance'),
+    (('performance',), 'performance'),
+    (('quality',), 'quality_issues'),
+    (('section',), 'quality_issues'),
+    (('quote',), 'quality_issues'),
+)
+
 def detect_warning_type(warning_text: str) -> str:
     """Try to detect warning type from text"""
-    warning_lower = warning_text.lower()
-    
-    if 'parse' in warning_lower and 'date' in warning_lower:
-        return 'date_parsing'
-    elif 'days old' in warning_lower:
-        return 'old_episodes' 
-    elif 'mp3' in warning_lower and 'missing' in warning_lower:
-        return 'missing_mp3'
-    elif 'title' in warning_lower and 'missing' in warning_lower:
-        return 'missing_title'
-    elif 'http' in warning_lower or 'connection' in warning_lower:
-        return 'feed_errors'
-    elif 'duplicate' in warning_lower:
-        return 'duplicates'
-    elif 'success rate' in warning_lower or 'performance' in warning_lower:
-        return 'performance'
-    elif 'quality' in warning_lower or 'section' in warning_lower or 'quote' in warning_lower:
-        return 'quality_issues'
-    else:
-        return 'unknown'
+    warning_lower = warning_text.casefold()
+
+    for keywords, warning_type in _WARNING_RULES:
+        for keyword in keywords:
+            if keyword not in warning_lower:
+                break
+        else:
+            return warning_type
+    return 'unknown'
 
 def main():
     if len(sys.argv) < 2:
@@ -5,36 +5,90 @@ Checks feed availability, validates content, and monitors for issues
 Usage: python3 evals/feed_health.py [--verbose]
 """
 
-import json
 import sys
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
 import time
 
 # Add project root to path for imports
 sys.path.insert(0, str(Path(__file__).parents[1]))
 
-from scripts.fetch_feed import get_latest_episode
-import feedparser
+from utils import seen_store
+from utils.json_utils import atomic_write_json, load_json_file, loads_json
+from scripts.fetch_feed import fetch_feed_body, get_latest_episode, latest_from_parsed, parse_feed
 import requests
 
-def check_feed_availability(rss_url: str, timeout: int = 10) -> dict:
-    """Check if RSS feed is accessible"""
+# Feeds are checked concurrently; requests to the same host stay serialized
+# and at least HOST_DELAY apart, so servers still see one request at a time
+MAX_WORKERS = 8
+HOST_DELAY = 0.5
+_host_slots = defaultdict(threading.Lock)
+_host_slots_lock = threading.Lock()
+# Monotonic time each host's last request finished, written under its slot
+_last_hit = {}
+
+FEED_CACHE_FILE = Path(__file__).parents[1] / "logs" / "feed_cache.json"
+
+@contextmanager
+def host_slot(url: str):
+    """
+    Hold the per-host slot for one request. Waits only for what is left of
+    HOST_DELAY since the host's previous request, so a host's first request
+    goes out immediately.
+    """
+    host = urlparse(url).netloc
+    with _host_slots_lock:
+        lock = _host_slots[host]
+    with lock:
+        wait = HOST_DELAY - (time.monotonic() - _last_hit.get(host, float("-inf")))
+        if wait > 0:
+            time.sleep(wait)
+        try:
+            yield
+        finally:
+            _last_hit[host] = time.monotonic()
+
+def check_feed_availability(rss_url: str, timeout: int = 10, cached: dict = None):
+    """
+    Check if RSS feed is accessible.
+    Returns (status dict, parsed feed). With a cached entry from a previous run
+    the request is conditional; on HTTP 304 the parsed feed is None and the
+    status carries "not_modified": True.
+    """
+    headers = {'User-Agent': 'Podcast-Automation/1.0 (Personal Use)'}
+    if cached:
+        if cached.get("etag"):
+            headers['If-None-Match'] = cached["etag"]
+        if cached.get("last_modified"):
+            headers['If-Modified-Since'] = cached["last_modified"]
+
     try:
-        response = requests.get(rss_url, timeout=timeout, headers={
-            'User-Agent': 'Podcast-Automation/1.0 (Personal Use)'
-        })
+        response, body = fetch_feed_body(rss_url, timeout=timeout, headers=headers)
         
+        if response.status_code == 304 and cached:
+            return dict(cached["availability"], not_modified=True), None
+
         if response.status_code == 200:
-            # Try to parse as RSS
-            feed = feedparser.parse(response.content)
+            # Try to parse as RSS (shared, read-only parse cache)
+            feed = parse_feed(body)
+            validators = {
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified")
+            }
             
             if feed.bozo:
                 return {
                     "status": "warning",
                     "message": f"Feed parsed with errors: {feed.bozo_exception}",
-                    "http_code": response.status_code
-                }
+                    "http_code": response.status_code,
+                    **validators
+                }, feed
             
             return {
                 "status": "ok",
@@ -42,42 +96,70 @@ def check_feed_availability(rss_url: str, timeout: int = 10) -> dict:
                 "http_code": response.status_code,
                 "entries_count": len(feed.entries),
                 "feed_title": getattr(feed.feed, 'title', 'Unknown'),
-                "last_updated": getattr(feed.feed, 'updated', None)
-            }
+                "last_updated": getattr(feed.feed, 'updated', None),
+                **validators
+            }, feed
         else:
             return {
                 "status": "error",
                 "message": f"HTTP {response.status_code}: {response.reason}",
                 "http_code": response.status_code
-            }
+            }, None
     
     except requests.exceptions.Timeout:
         return {
             "status": "error",
             "message": "Request timed out",
             "http_code": None
-        }
+        }, None
     except requests.exceptions.ConnectionError:
         return {
             "status": "error", 
             "message": "Connection error",
             "http_code": None
-        }
+        }, None
     except Exception as e:
         return {
             "status": "error",
             "message": f"Unexpected error: {str(e)}",
             "http_code": None
+        }, None
+
+def analyze_feed_content(feed_info: dict, parsed=None) -> dict:
+    """Analyze feed content for potential issues, reusing an already parsed feed if given"""
+    try:
+        if parsed is not None:
+            latest = latest_from_parsed(parsed)
+        else:
+            # Get latest episode info using our existing function
+            latest = get_latest_episode(feed_info["rss"])
+    except Exception as e:
+        return {
+            "status": "error",
+            "message": f"Failed to analyze content: {str(e)}"
         }
+    return analyze_latest_episode(latest)
 
-def analyze_feed_content(feed_info: dict) -> dict:
-    """Analyze feed content for potential issues"""
-    rss_url = feed_info["rss"]
-    
+_WEEKDAY_PREFIXES = frozenset({"Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"})
+
+def parse_published(date_str: str) -> datetime:
+    """Parse an ISO 8601 or RFC 2822 feed date, picking the parser from the string's shape"""
+    if len(date_str) > 10 and date_str[4] == '-' and 'T' in date_str:
+        # ISO 8601 format: 2025-09-22T10:00:00+00:00
+        if date_str.endswith('Z'):
+            date_str = date_str[:-1] + '+00:00'
+        return datetime.fromisoformat(date_str)
+    if date_str[:3] in _WEEKDAY_PREFIXES or date_str[:1].isdigit():
+        # RFC 2822 format: Wed, 22 Sep 2025 10:00:00 +0000
+        try:
+            return parsedate_to_datetime(date_str)
+        except (TypeError, ValueError):
+            pass
+    raise ValueError(f"Unsupported date format: {date_str}")
+
+def analyze_latest_episode(latest: dict) -> dict:
+    """Check a latest-episode dict (see scripts.fetch_feed) for missing fields and staleness"""
     try:
-        # Get latest episode info using our existing function
-        latest = get_latest_episode(rss_url)
-        
         if not latest:
             return {
                 "status": "warning",
@@ -102,23 +184,7 @@ def analyze_feed_content(feed_info: dict) -> dict:
             try:
                 # Parse date string - handle multiple formats
                 if isinstance(latest["published"], str):
-                    date_str = latest["published"]
-                    # Try ISO 8601 format first (most common in modern RSS feeds)
-                    try:
-                        if 'T' in date_str:
-                            # ISO 8601 format: 2025-09-22T10:00:00+00:00
-                            if date_str.endswith('Z'):
-                                date_str = date_str.replace('Z', '+00:00')
-                            pub_date = datetime.fromisoformat(date_str)
-                        else:
-                            # RFC 2822 format: Wed, 22 Sep 2025 10:00:00 +0000
-                            pub_date = datetime.strptime(date_str, "%a, %d %b %Y %H:%M:%S %z")
-                    except ValueError:
-                        # Try other common formats
-                        try:
-                            pub_date = datetime.strptime(date_str, "%a, %d %b %Y %H:%M:%S %z")
-                        except ValueError:
-                            raise ValueError(f"Unsupported date format: {date_str}")
+                    pub_date = parse_published(latest["published"])
                 else:
                     pub_date = latest["published"]
                 
@@ -166,31 +232,59 @@ def analyze_feed_content(feed_info: dict) -> dict:
             "message": f"Failed to analyze content: {str(e)}"
         }
 
-def check_seen_status(feed_name: str, seen_data: dict) -> dict:
+def check_seen_status(feed_name: str, seen_db) -> dict:
     """Check processing status for this feed"""
-    if feed_name not in seen_data:
+    count, latest = seen_store.feed_status(seen_db, feed_name) if seen_db is not None else (0, None)
+    if not count:
         return {
             "status": "new",
             "message": "Feed not yet processed",
             "processed_count": 0
         }
     
-    processed_episodes = seen_data[feed_name]
-    count = len(processed_episodes)
-    
     return {
         "status": "processed",
         "message": f"{count} episodes processed",
         "processed_count": count,
-        "latest_processed": processed_episodes[-1] if processed_episodes else None
+        "latest_processed": latest
     }
 
-def main():
-    verbose = "--verbose" in sys.argv
+def check_one(feed: dict, cache: dict) -> dict:
+    """
+    Run the availability and content checks for one feed (thread-pool worker).
+    The feed is fetched and parsed once; unchanged feeds (HTTP 304) reuse the
+    latest episode stored in cache by the previous run.
+    """
+    rss_url = feed.get("rss")
+    if not rss_url:
+        return {"availability": None, "content": None}
+
+    cached = cache.get(rss_url)
+    with host_slot(rss_url):
+        availability, parsed = check_feed_availability(rss_url, cached=cached)
+
+    content = None
+    if availability.get("not_modified"):
+        content = analyze_latest_episode(cached["latest"])
+    elif parsed is not None:
+        latest = latest_from_parsed(parsed)
+        content = analyze_latest_episode(latest)
+        if availability.get("etag") or availability.get("last_modified"):
+            cache[rss_url] = {
+                "etag": availability["etag"],
+                "last_modified": availability["last_modified"],
+                "availability": availability,
+                "latest": latest,
+            }
+
+    return {"availability": availability, "content": content}
+
+def main(argv: list = None):
+    argv = sys.argv[1:] if argv is None else argv
+    verbose = "--verbose" in argv
     
     project_root = Path(__file__).parents[1]
     feeds_config = project_root / "config" / "feeds.json"
-    seen_file = project_root / "data" / "seen.json"
     
     if not feeds_config.exists():
         print("❌ feeds.json not found")
@@ -202,14 +296,10 @@ def main():
     print()
     
     # Load configuration
-    with open(feeds_config, 'r') as f:
-        feeds = json.load(f)
+    feeds = load_json_file(feeds_config)
     
-    # Load seen episodes if available
-    seen_data = {}
-    if seen_file.exists():
-        with open(seen_file, 'r') as f:
-            seen_data = json.load(f)
+    # Open the seen-episode database read-only, if available
+    seen_db = seen_store.open_seen_db(project_root / "data", create=False)
     
     overall_stats = {
         "total_feeds": len(feeds),
@@ -219,7 +309,20 @@ def main():
         "total_issues": 0
     }
     
-    for i, feed in enumerate(feeds, 1):
+    # ETag/Last-Modified and last results per feed URL for conditional GETs
+    cache = {}
+    if FEED_CACHE_FILE.exists():
+        try:
+            cache = loads_json(FEED_CACHE_FILE.read_bytes())
+        except (OSError, ValueError):
+            cache = {}
+
+    # Run the network checks concurrently, then print results in config order
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        results = list(executor.map(lambda feed: check_one(feed, cache), feeds))
+    atomic_write_json(FEED_CACHE_FILE, cache)
+
+    for i, (feed, result) in enumerate(zip(feeds, results), 1):
         name = feed.get("name", f"Feed #{i}")
         rss_url = feed.get("rss")
         tags = feed.get("tags", [])
@@ -240,7 +343,7 @@ def main():
         
         # Check feed availability
         print("  🌐 Checking availability...", end=" ")
-        availability = check_feed_availability(rss_url)
+        availability = result["availability"]
         
         if availability["status"] == "ok":
             print("✅ OK")
@@ -259,7 +362,7 @@ def main():
         
         # Analyze content
         print("  📝 Analyzing content...", end=" ")
-        content_analysis = analyze_feed_content(feed)
+        content_analysis = result["content"]
         
         if content_analysis["status"] == "ok":
             print("✅ OK")
@@ -287,14 +390,13 @@ def main():
                 print(f"      Has MP3: {'Yes' if latest['has_mp3'] else 'No'}")
         
         # Check processing status
-        seen_status = check_seen_status(name, seen_data)
+        seen_status = check_seen_status(name, seen_db)
         print(f"  📊 Processing: {seen_status['message']}")
         
         print()
-        
-        # Brief delay to be respectful to servers
-        if i < len(feeds):
-            time.sleep(0.5)
+    
+    if seen_db is not None:
+        seen_db.close()
     
     # Summary
     print("=" * 50)
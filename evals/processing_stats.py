@@ -5,12 +5,52 @@ Analyzes pipeline performance, processing times, and identifies bottlenecks
 Usage: python3 evals/processing_stats.py [--days N]
 """
 
+import heapq
+import io
+import mmap
+import multiprocessing
+import os
 import re
 import sys
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice, repeat
+from operator import itemgetter
 from pathlib import Path
 from datetime import datetime, timedelta
-from collections import defaultdict
-import json
+from collections import Counter, defaultdict
+
+# Add project root to path for imports
+sys.path.insert(0, str(Path(__file__).parents[1]))
+
+from utils.json_utils import atomic_write_json, loads_json
+
+RUN_START = b'=== Podcast automation pipeline started ==='
+
+# Parsed runs are cached next to the log so each call only parses appended runs
+CACHE_NAME = ".cron_stats.cache.json"
+CACHE_VERSION = 1
+
+# Logs at least this large are parsed on a process pool (one worker per core);
+# below it the pool start-up costs more than it saves
+PARALLEL_MIN_BYTES = 32 * 1024 * 1024
+# Runs handed to the pool at a time, so memory stays bounded while streaming
+PARALLEL_BATCH_RUNS = 512
+
+# Pipeline log lines are "[timestamp] message"; one anchored match per line
+# reads the timestamp and tells which marker (if any) follows it via lastgroup
+_LINE_RE = re.compile(
+    r'\[(?P<ts>\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2})\] '
+    r'(?:(?P<done>=== Podcast automation pipeline completed ===)'
+    r'|== (?P<feed>.+) ==$'
+    r'|(?P<audio>Audio:.*mp3)'
+    r'|(?P<skip>Skipping\. Already processed:)'
+    r'|Episode cost: \$(?P<cost>\d+\.\d+))?'
+)
+
+def _parse_log_ts(ts) -> datetime:
+    """Parse a regex-checked 'YYYY-MM-DD HH:MM:SS' log timestamp, str or bytes (much faster than strptime)"""
+    return datetime(int(ts[0:4]), int(ts[5:7]), int(ts[8:10]),
+                    int(ts[11:13]), int(ts[14:16]), int(ts[17:19]))
 
 def parse_cron_log(log_file: Path, days_back: int = 7) -> dict:
     """Parse cron log for processing statistics"""
@@ -32,31 +72,28 @@ def parse_cron_log(log_file: Path, days_back: int = 7) -> dict:
     cutoff_date = datetime.now() - timedelta(days=days_back)
     
     try:
-        with open(log_file, 'r', encoding='utf-8') as f:
-            content = f.read()
-    except Exception as e:
+        with open(log_file, 'rb') as f:
+            runs = load_runs(f, log_file.with_name(CACHE_NAME))
+    except (OSError, ValueError) as e:
         return {"error": f"Failed to read log: {e}"}
     
-    # Split into runs (each run starts with "=== Podcast automation pipeline started ===")
-    runs = re.split(r'=== Podcast automation pipeline started ===', content)[1:]  # Skip first empty part
-    
-    for run_content in runs:
-        run_data = parse_single_run(run_content, cutoff_date)
-        if run_data:
-            stats["runs"].append(run_data)
-            
-            # Aggregate statistics
-            stats["episodes_processed"] += run_data.get("episodes_processed", 0)
-            stats["episodes_skipped"] += run_data.get("episodes_skipped", 0)
-            
-            for feed, count in run_data.get("feeds_processed", {}).items():
-                stats["feeds_processed"][feed] += count
-            
-            for feed, count in run_data.get("feeds_skipped", {}).items():
-                stats["feeds_skipped"][feed] += count
-            
-            if run_data.get("errors"):
-                stats["errors"].extend(run_data["errors"])
+    for run_data in runs:
+        if run_data["timestamp"] < cutoff_date:
+            continue  # Skip old runs
+        stats["runs"].append(run_data)
+        
+        # Aggregate statistics
+        stats["episodes_processed"] += run_data.get("episodes_processed", 0)
+        stats["episodes_skipped"] += run_data.get("episodes_skipped", 0)
+        
+        for feed, count in run_data.get("feeds_processed", {}).items():
+            stats["feeds_processed"][feed] += count
+        
+        for feed, count in run_data.get("feeds_skipped", {}).items():
+            stats["feeds_skipped"][feed] += count
+        
+        if run_data.get("errors"):
+            stats["errors"].extend(run_data["errors"])
     
     # Set date range
     if stats["runs"]:
@@ -65,9 +102,100 @@ def parse_cron_log(log_file: Path, days_back: int = 7) -> dict:
     
     return stats
 
+def load_runs(f, cache_path: Path) -> list:
+    """
+    Return every parsed run in the log file f (opened in binary mode), in log
+    order. Runs before the last RUN_START never change, so they are kept in
+    cache_path with the offset of that marker and only later bytes are parsed
+    on the next call; the last run may still be growing and is always
+    re-parsed. The cache is dropped when the log no longer has a run start at
+    the cached offset (rotated or truncated).
+    """
+    offset, runs = _read_run_cache(cache_path)
+    f.seek(offset)
+    if offset > 0 and f.read(len(RUN_START)) != RUN_START:
+        offset, runs = 0, []
+    
+    last_start = _last_run_start(f)
+    if last_start > offset:
+        parallel = last_start - offset >= PARALLEL_MIN_BYTES
+        runs.extend(run for run in parse_runs(iter_runs(f, offset, last_start), datetime.min, parallel) if run)
+        offset = last_start
+        try:
+            atomic_write_json(cache_path, {
+                "version": CACHE_VERSION,
+                "offset": offset,
+                "runs": [_run_to_json(run) for run in runs],
+            }, indent=False)
+        except OSError:
+            pass  # Read-only logs dir: parse from scratch next time
+    
+    if last_start != -1:
+        runs.extend(run for run in parse_runs(iter_runs(f, last_start), datetime.min) if run)
+    return runs
+
+def _read_run_cache(cache_path: Path):
+    """Return (offset, runs) from cache_path, or (0, []) if missing or unreadable"""
+    try:
+        cache = loads_json(cache_path.read_bytes())
+        if cache.get("version") == CACHE_VERSION:
+            return cache["offset"], [_run_from_json(run) for run in cache["runs"]]
+    except (OSError, ValueError, KeyError, TypeError, AttributeError):
+        pass
+    return 0, []
+
+def _run_to_json(run: dict) -> dict:
+    # Error timestamps are the run's own, so they are rebuilt on load
+    return dict(run, timestamp=run["timestamp"].isoformat(),
+                errors=[{"feed": e["feed"], "message": e["message"]} for e in run["errors"]])
+
+def _run_from_json(run: dict) -> dict:
+    timestamp = datetime.fromisoformat(run["timestamp"])
+    return dict(run, timestamp=timestamp,
+                errors=[dict(e, timestamp=timestamp) for e in run["errors"]])
+
+def _last_run_start(f) -> int:
+    """Byte offset of the last RUN_START in f, or -1"""
+    if os.fstat(f.fileno()).st_size == 0:
+        return -1
+    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        return mm.rfind(RUN_START)
+
+def iter_runs(f, start: int = 0, stop: int = None):
+    """
+    Yield the text of each pipeline run in bytes [start, stop) of the log
+    file f (opened in binary mode), splitting on RUN_START; text before the
+    first run is skipped. Markers are found in the mmap'd bytes without
+    copying the file.
+    """
+    if os.fstat(f.fileno()).st_size == 0:
+        return
+    
+    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        stop = len(mm) if stop is None else stop
+        start = mm.find(RUN_START, start, stop)
+        while start != -1:
+            body = start + len(RUN_START)
+            start = mm.find(RUN_START, body, stop)
+            end = stop if start == -1 else start
+            yield mm[body:end].decode('utf-8')
+
+def parse_runs(runs, cutoff_date: datetime, parallel: bool = False):
+    """Yield parse_single_run results in log order, on a process pool if parallel"""
+    if not parallel:
+        for run_lines in runs:
+            yield parse_single_run(run_lines, cutoff_date)
+        return
+    
+    # spawn rather than fork: eval_runner calls this from worker threads
+    with ProcessPoolExecutor(mp_context=multiprocessing.get_context("spawn")) as executor:
+        while batch := list(islice(runs, PARALLEL_BATCH_RUNS)):
+            yield from executor.map(parse_single_run, batch, repeat(cutoff_date), chunksize=8)
+
 def parse_single_run(run_content: str, cutoff_date: datetime) -> dict:
     """Parse a single pipeline run from log content"""
-    lines = run_content.strip().split('\n')
+    # Line splitting with universal newlines, as when reading the log as text
+    lines = io.StringIO(run_content, newline=None)
     
     run_data = {
         "timestamp": None,
@@ -82,14 +210,16 @@ def parse_single_run(run_content: str, cutoff_date: datetime) -> dict:
     
     current_feed = None
     
+    # Lines keep their trailing newline: _LINE_RE is anchored at the start and
+    # its "$" also matches before a final "\n", so only error messages are stripped
     for line in lines:
-        line = line.strip()
+        m = _LINE_RE.match(line)
+        marker = m.lastgroup if m else None
         
         # Extract timestamp from first line
-        timestamp_match = re.search(r'^\[(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2})\]', line)
-        if timestamp_match and run_data["timestamp"] is None:
+        if m and run_data["timestamp"] is None:
             try:
-                timestamp = datetime.strptime(timestamp_match.group(1), "%Y-%m-%d %H:%M:%S")
+                timestamp = _parse_log_ts(m.group("ts"))
                 if timestamp < cutoff_date:
                     return None  # Skip old runs
                 run_data["timestamp"] = timestamp
@@ -97,52 +227,55 @@ def parse_single_run(run_content: str, cutoff_date: datetime) -> dict:
                 pass
         
         # Track current feed being processed
-        feed_match = re.search(r'== (.+) ==$', line)
-        if feed_match:
-            current_feed = feed_match.group(1)
+        if marker == "feed":
+            current_feed = m.group("feed")
         
         # Count processed episodes
-        if "Audio:" in line and "mp3" in line:
+        elif marker == "audio":
             run_data["episodes_processed"] += 1
             if current_feed:
                 run_data["feeds_processed"][current_feed] += 1
         
         # Count skipped episodes
-        if "Skipping. Already processed:" in line:
+        elif marker == "skip":
             run_data["episodes_skipped"] += 1
             if current_feed:
                 run_data["feeds_skipped"][current_feed] += 1
         
-        # Track errors
-        if "error" in line.lower() or "failed" in line.lower() or "exception" in line.lower():
-            run_data["errors"].append({
-                "feed": current_feed,
-                "message": line,
-                "timestamp": run_data["timestamp"]
-            })
-        
         # Extract cost summary
-        cost_match = re.search(r'Episode cost: \$(\d+\.\d+)', line)
-        if cost_match:
-            cost = float(cost_match.group(1))
+        elif marker == "cost":
+            cost = float(m.group("cost"))
             if run_data["cost_summary"] is None:
                 run_data["cost_summary"] = {"total_cost": 0, "episode_costs": []}
             run_data["cost_summary"]["total_cost"] += cost
             run_data["cost_summary"]["episode_costs"].append(cost)
         
         # Check for completion
-        if "=== Podcast automation pipeline completed ===" in line:
-            # Try to extract timestamp for duration calculation
-            end_timestamp_match = re.search(r'^\[(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2})\]', line)
-            if end_timestamp_match and run_data["timestamp"]:
-                try:
-                    end_time = datetime.strptime(end_timestamp_match.group(1), "%Y-%m-%d %H:%M:%S")
-                    duration = (end_time - run_data["timestamp"]).total_seconds()
-                    run_data["duration"] = duration
-                except ValueError:
-                    pass
-    
-    return run_data if run_data["timestamp"] else None
+        elif marker == "done" and run_data["timestamp"]:
+            # Use the completion line's timestamp for duration calculation
+            try:
+                end_time = _parse_log_ts(m.group("ts"))
+                duration = (end_time - run_data["timestamp"]).total_seconds()
+                run_data["duration"] = duration
+            except ValueError:
+                pass
+        
+        # Track errors (any line, including tracebacks and transcript output)
+        lowered = line.lower()
+        if "error" in lowered or "failed" in lowered or "exception" in lowered:
+            run_data["errors"].append({
+                "feed": current_feed,
+                "message": line.strip(),
+                "timestamp": run_data["timestamp"]
+            })
+    
+    if not run_data["timestamp"]:
+        return None
+    
+    # Plain dicts pickle cheaply back from pool workers
+    run_data["feeds_processed"] = dict(run_data["feeds_processed"])
+    run_data["feeds_skipped"] = dict(run_data["feeds_skipped"])
+    return run_data
 
 def analyze_processing_patterns(stats: dict) -> dict:
     """Analyze processing patterns and identify issues"""
@@ -168,13 +301,12 @@ def analyze_processing_patterns(stats: dict) -> dict:
     analysis["success_rate"] = successful_runs / len(stats["runs"]) * 100
     
     # Most active feeds (processed most episodes)
-    feed_activity = [(feed, count) for feed, count in stats["feeds_processed"].items()]
-    analysis["most_active_feeds"] = sorted(feed_activity, key=lambda x: x[1], reverse=True)[:5]
+    analysis["most_active_feeds"] = heapq.nlargest(5, stats["feeds_processed"].items(), key=itemgetter(1))
     
     # Problematic feeds (high error rate or no processing)
+    error_counts = Counter(error["feed"] for run in stats["runs"] for error in run["errors"])
     for feed in stats["feeds_processed"]:
-        feed_errors = sum(1 for run in stats["runs"] for error in run["errors"] if error["feed"] == feed)
-        if feed_errors > len(stats["runs"]) * 0.5:  # More than 50% error rate
+        if error_counts[feed] > len(stats["runs"]) * 0.5:  # More than 50% error rate
             analysis["problematic_feeds"].append((feed, "High error rate"))
     
     # Check for feeds that are never processing new content
@@ -205,12 +337,13 @@ def analyze_processing_patterns(stats: dict) -> dict:
     
     return analysis
 
-def main():
-    # Parse arguments
+def main(argv: list = None):
+    # Parse arguments (argv lets eval_runner call this in-process)
+    argv = sys.argv[1:] if argv is None else argv
     days_back = 7
-    if len(sys.argv) > 1:
-        if sys.argv[1] == "--days" and len(sys.argv) > 2:
-            days_back = int(sys.argv[2])
+    if len(argv) > 0:
+        if argv[0] == "--days" and len(argv) > 1:
+            days_back = int(argv[1])
     
     project_root = Path(__file__).parents[1]
     log_file = project_root / "logs" / "cron.log"
@@ -283,7 +416,7 @@ def main():
     
     # Recent errors
     if stats['errors']:
-        recent_errors = sorted(stats['errors'], key=lambda x: x['timestamp'], reverse=True)[:5]
+        recent_errors = heapq.nlargest(5, stats['errors'], key=itemgetter('timestamp'))
         print("🚨 Recent Errors")
         print("-" * 30)
         for error in recent_errors:
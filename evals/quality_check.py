@@ -5,12 +5,36 @@ Analyzes transcript quality, summary completeness, and content metrics
 Usage: python3 evals/quality_check.py [--recent N]
 """
 
-import json
+import os
 import re
 import sys
 from pathlib import Path
 from datetime import datetime
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+# Add project root to path for imports
+sys.path.insert(0, str(Path(__file__).parents[1]))
+
+from utils.json_utils import loads_json
+
+# Episodes are read and analyzed on this many threads; output stays in order
+MAX_WORKERS = 8
+# Leading transcript characters checked for common English words
+LANGUAGE_SAMPLE_CHARS = 4096
+
+# Summary headings every episode must have ("Reflection Questions" is optional)
+REQUIRED_SECTIONS = ("Episode Overview", "Key Sections", "Top 5 Lessons")
+
+# Transcript and summary patterns, compiled once for all files
+_TIMESTAMP_RE = re.compile(r'\[(\d+\.\d+) --> (\d+\.\d+)\]')
+_ENGLISH_WORD_RE = re.compile(r'\b(the|and|is|in|to|of|a|that|it|with|for|as|was|on|are|you)\b')
+_SECTION_RE = re.compile(r'^## (.+)$', re.MULTILINE)
+_QUOTE_RE = re.compile(r'\*\*"([^"]+)"\*\* — \*\*([^*]+)\*\*')
+
+def count_line_prefix(content: str, prefix: str) -> int:
+    """Count lines starting with prefix (str.count, no match list built)"""
+    return content.count("\n" + prefix) + content.startswith(prefix)
 
 def analyze_transcript(transcript_path: Path) -> dict:
     """Analyze transcript quality metrics"""
@@ -31,25 +55,21 @@ def analyze_transcript(transcript_path: Path) -> dict:
     }
     
     # Check for timestamps (indicates Whisper format)
-    timestamp_pattern = r'\[\d+\.\d+ --> \d+\.\d+\]'
-    timestamps = re.findall(timestamp_pattern, content)
+    timestamps = _TIMESTAMP_RE.findall(content)
     metrics["has_timestamps"] = len(timestamps) > 0
     metrics["timestamp_count"] = len(timestamps)
     
     # Estimate duration from timestamps if available
     if timestamps:
         try:
-            last_timestamp = timestamps[-1]
-            time_match = re.search(r'\[(\d+\.\d+) --> (\d+\.\d+)\]', last_timestamp)
-            if time_match:
-                end_time = float(time_match.group(2))
-                metrics["estimated_duration_sec"] = end_time
-                metrics["estimated_duration_min"] = end_time / 60
+            end_time = float(timestamps[-1][1])
+            metrics["estimated_duration_sec"] = end_time
+            metrics["estimated_duration_min"] = end_time / 60
         except:
             pass
     
     # Language indicators
-    metrics["likely_english"] = bool(re.search(r'\b(the|and|is|in|to|of|a|that|it|with|for|as|was|on|are|you)\b', content.lower()))
+    metrics["likely_english"] = bool(_ENGLISH_WORD_RE.search(content[:LANGUAGE_SAMPLE_CHARS].lower()))
     
     # Quality indicators
     metrics["avg_words_per_line"] = metrics["word_count"] / max(metrics["line_count"], 1)
@@ -75,26 +95,24 @@ def analyze_summary(summary_path: Path) -> dict:
     }
     
     # Structure analysis
-    sections = re.findall(r'^## (.+)$', content, re.MULTILINE)
-    subsections = re.findall(r'^### (.+)$', content, re.MULTILINE)
+    sections = _SECTION_RE.findall(content)
     
     metrics["section_count"] = len(sections)
-    metrics["subsection_count"] = len(subsections)
+    metrics["subsection_count"] = count_line_prefix(content, "### ")
     metrics["sections"] = sections
     
     # Quote analysis
-    quote_pattern = r'\*\*"([^"]+)"\*\* — \*\*([^*]+)\*\*'
-    quotes = re.findall(quote_pattern, content)
+    quotes = _QUOTE_RE.findall(content)
     metrics["quote_count"] = len(quotes)
     metrics["quotes"] = [{"text": q[0][:100] + "..." if len(q[0]) > 100 else q[0], "speaker": q[1]} for q in quotes]
     
-    # Key sections check
-    expected_sections = ["Episode Overview", "Key Sections", "Top 5 Lessons", "Reflection Questions"]
-    metrics["has_required_sections"] = all(section in content for section in expected_sections[:3])  # First 3 are required
+    # Key sections check: they are "## " headings, so search the titles found
+    # above rather than rescanning the whole summary once per section
+    section_titles = "\n".join(sections)
+    metrics["has_required_sections"] = all(section in section_titles for section in REQUIRED_SECTIONS)
     
     # Bullet point analysis
-    bullet_points = re.findall(r'^- (.+)$', content, re.MULTILINE)
-    metrics["bullet_point_count"] = len(bullet_points)
+    metrics["bullet_point_count"] = count_line_prefix(content, "- ")
     
     return metrics
 
@@ -103,11 +121,16 @@ def check_repeated_phrases(text: str, min_length: int = 10, threshold: int = 3)
     words = text.lower().split()
     phrases = {}
     
-    for i in range(len(words) - min_length + 1):
-        phrase = " ".join(words[i:i+min_length])
-        phrases[phrase] = phrases.get(phrase, 0) + 1
+    # Sliding min_length-word windows as tuples: no slicing or joining, and
+    # stop as soon as one phrase reaches the threshold
+    windows = zip(*(words[i:] for i in range(min_length)))
+    for phrase in windows:
+        count = phrases.get(phrase, 0) + 1
+        if count >= threshold:
+            return True
+        phrases[phrase] = count
     
-    return any(count >= threshold for count in phrases.values())
+    return False
 
 def analyze_metadata(meta_path: Path) -> dict:
     """Analyze metadata completeness"""
@@ -115,8 +138,7 @@ def analyze_metadata(meta_path: Path) -> dict:
         return {"error": "Metadata not found"}
     
     try:
-        with open(meta_path, 'r', encoding='utf-8') as f:
-            meta = json.load(f)
+        meta = loads_json(meta_path.read_bytes())
     except Exception as e:
         return {"error": f"Failed to read metadata: {e}"}
     
@@ -130,12 +152,31 @@ def analyze_metadata(meta_path: Path) -> dict:
     
     return metrics
 
-def main():
-    # Parse arguments
+def analyze_episode(summary_file: Path, transcripts_dir: Path) -> dict:
+    """Analyze one episode's summary, transcript and metadata (thread-pool worker)"""
+    # Get corresponding files
+    base_name = summary_file.name.replace("_summary.txt", "")
+    transcript_file = transcripts_dir / f"{base_name}.txt"
+    meta_file = summary_file.parent / f"{base_name}_summary.meta.json"
+    
+    # Handle translated files
+    if not transcript_file.exists():
+        transcript_file = transcripts_dir / f"{base_name}_translated.txt"
+    
+    return {
+        "base_name": base_name,
+        "summary": analyze_summary(summary_file),
+        "transcript": analyze_transcript(transcript_file) if transcript_file.exists() else None,
+        "metadata": analyze_metadata(meta_file) if meta_file.exists() else None,
+    }
+
+def main(argv: list = None):
+    # Parse arguments (argv lets eval_runner call this in-process)
+    argv = sys.argv[1:] if argv is None else argv
     recent_count = None
-    if len(sys.argv) > 1:
-        if sys.argv[1] == "--recent" and len(sys.argv) > 2:
-            recent_count = int(sys.argv[2])
+    if len(argv) > 0:
+        if argv[0] == "--recent" and len(argv) > 1:
+            recent_count = int(argv[1])
     
     project_root = Path(__file__).parents[1]
     summaries_dir = project_root / "data" / "summaries"
@@ -148,15 +189,17 @@ def main():
     print("📊 Podcast Quality Analysis")
     print("=" * 50)
     
-    # Find all summary files
-    summary_files = list(summaries_dir.glob("*_summary.txt"))
+    # Find all summary files with their mtimes in one directory scan
+    with os.scandir(summaries_dir) as it:
+        entries = [(entry.stat().st_mtime, entry.path) for entry in it if entry.name.endswith("_summary.txt")]
     
-    if not summary_files:
+    if not entries:
         print("No summary files found")
         return
     
     # Sort by modification time (newest first)
-    summary_files.sort(key=lambda x: x.stat().st_mtime, reverse=True)
+    entries.sort(reverse=True)
+    summary_files = [Path(path) for _, path in entries]
     
     # Limit to recent files if specified
     if recent_count:
@@ -178,23 +221,19 @@ def main():
         "issues": []
     }
     
-    for summary_file in summary_files:
+    # Overlap file reads across episodes, then report in mtime order
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        episodes = list(executor.map(lambda f: analyze_episode(f, transcripts_dir), summary_files))
+    
+    for episode in episodes:
         stats["total_episodes"] += 1
-        
-        # Get corresponding files
-        base_name = summary_file.name.replace("_summary.txt", "")
-        transcript_file = transcripts_dir / f"{base_name}.txt"
-        meta_file = summary_file.parent / f"{base_name}_summary.meta.json"
-        
-        # Handle translated files
-        if not transcript_file.exists():
-            transcript_file = transcripts_dir / f"{base_name}_translated.txt"
+        base_name = episode["base_name"]
         
         print(f"📝 {base_name}")
         print("-" * 30)
         
         # Analyze summary
-        summary_metrics = analyze_summary(summary_file)
+        summary_metrics = episode["summary"]
         if "error" not in summary_metrics:
             stats["successful_summaries"] += 1
             stats["total_quotes"] += summary_metrics["quote_count"]
@@ -214,8 +253,8 @@ def main():
             stats["issues"].append(f"{base_name}: {summary_metrics['error']}")
         
         # Analyze transcript
-        if transcript_file.exists():
-            transcript_metrics = analyze_transcript(transcript_file)
+        transcript_metrics = episode["transcript"]
+        if transcript_metrics is not None:
             if "error" not in transcript_metrics:
                 print(f"  Transcript: {transcript_metrics['word_count']} words")
                 if transcript_metrics.get("estimated_duration_min"):
@@ -231,8 +270,8 @@ def main():
             print(f"  ⚠️  Transcript not found")
         
         # Analyze metadata
-        if meta_file.exists():
-            meta_metrics = analyze_metadata(meta_file)
+        meta_metrics = episode["metadata"]
+        if meta_metrics is not None:
             if "error" not in meta_metrics:
                 print(f"  Metadata: {meta_metrics['tag_count']} tags")
                 if not meta_metrics["has_all_required"]:
@@ -4,17 +4,92 @@ View cost logs for the podcast pipeline
 Usage: python3 evals/view_costs.py [--tail N]
 """
 
-import json
+import io
+import os
 import sys
 from pathlib import Path
 from datetime import datetime, timedelta
 
+# Add project root to path for imports
+sys.path.insert(0, str(Path(__file__).parents[1]))
+
+from utils.json_utils import atomic_write_json, loads_json
+
+def summarize_daily_totals(daily_totals: Path) -> dict:
+    """
+    Today's and yesterday's entries plus month-to-date and all-time sums from
+    daily_costs.json. The result is kept in a sidecar file and reused while
+    daily_costs.json and the date are unchanged.
+    """
+    now = datetime.now()
+    today = now.strftime("%Y-%m-%d")
+    stat = daily_totals.stat()
+    key = [stat.st_mtime_ns, stat.st_size, today]
+
+    cache_file = daily_totals.with_suffix(".summary.json")
+    try:
+        cached = loads_json(cache_file.read_bytes())
+        if cached.get("key") == key:
+            return cached
+    except (OSError, ValueError):
+        pass
+
+    totals = loads_json(daily_totals.read_bytes())
+
+    yesterday = (now - timedelta(days=1)).strftime("%Y-%m-%d")
+    current_month = now.strftime("%Y-%m")
+
+    summary = {
+        "key": key,
+        "today": today,
+        "today_totals": totals.get(today),
+        "yesterday": yesterday,
+        "yesterday_totals": totals.get(yesterday),
+        "month": current_month,
+        "monthly_cost": 0,
+        "monthly_episodes": 0,
+        "all_time_cost": 0,
+        "all_time_episodes": 0,
+    }
+    for date_str, data in totals.items():
+        if date_str.startswith(current_month):
+            summary["monthly_cost"] += data["cost"]
+            summary["monthly_episodes"] += data["episodes"]
+        summary["all_time_cost"] += data["cost"]
+        summary["all_time_episodes"] += data["episodes"]
+
+    try:
+        atomic_write_json(cache_file, summary)
+    except OSError:
+        pass
+    return summary
+
+def tail_lines(path: Path, n: int, chunk: int = 8192) -> list:
+    """
+    Return the last n lines of a text file, like f.readlines()[-n:], reading
+    backwards from the end in chunks instead of loading the whole file
+    """
+    with open(path, 'rb') as f:
+        pos = f.seek(0, os.SEEK_END)
+        buf = b""
+        # One newline more than n guarantees the first of the n lines is whole
+        while pos > 0 and buf.count(b"\n") <= n:
+            step = min(chunk, pos)
+            pos -= step
+            f.seek(pos)
+            buf = f.read(step) + buf
+
+    # Drop the partial line in front of the first newline before decoding
+    if pos > 0:
+        buf = buf[buf.index(b"\n") + 1:]
+    return io.StringIO(buf.decode("utf-8"), newline=None).readlines()[-n:]
+
 def main():
     # Parse arguments
-    tail_lines = None
+    tail = None
     if len(sys.argv) > 1:
         if sys.argv[1] == "--tail" and len(sys.argv) > 2:
-            tail_lines = int(sys.argv[2])
+            tail = int(sys.argv[2])
 
     # Find log files
     project_root = Path(__file__).parents[1]
@@ -26,46 +101,35 @@ def main():
 
     # Show daily totals if available
     if daily_totals.exists():
-        with open(daily_totals, 'r') as f:
-            totals = json.load(f)
-
-        # Calculate totals for different periods
-        today = datetime.now().strftime("%Y-%m-%d")
-        yesterday = (datetime.now() - timedelta(days=1)).strftime("%Y-%m-%d")
-        current_month = datetime.now().strftime("%Y-%m")
+        summary = summarize_daily_totals(daily_totals)
 
         # Today's costs
-        if today in totals:
-            print(f"Today ({today}):")
-            print(f"  Episodes: {totals[today]['episodes']}")
-            print(f"  Cost: ${totals[today]['cost']:.2f}")
+        if summary["today_totals"] is not None:
+            print(f"Today ({summary['today']}):")
+            print(f"  Episodes: {summary['today_totals']['episodes']}")
+            print(f"  Cost: ${summary['today_totals']['cost']:.2f}")
             print()
 
         # Yesterday's costs
-        if yesterday in totals:
-            print(f"Yesterday ({yesterday}):")
-            print(f"  Episodes: {totals[yesterday]['episodes']}")
-            print(f"  Cost: ${totals[yesterday]['cost']:.2f}")
+        if summary["yesterday_totals"] is not None:
+            print(f"Yesterday ({summary['yesterday']}):")
+            print(f"  Episodes: {summary['yesterday_totals']['episodes']}")
+            print(f"  Cost: ${summary['yesterday_totals']['cost']:.2f}")
             print()
 
         # This month's total
-        monthly_total = 0
-        monthly_episodes = 0
-        for date_str, data in totals.items():
-            if date_str.startswith(current_month):
-                monthly_total += data["cost"]
-                monthly_episodes += data["episodes"]
-
+        monthly_total = summary["monthly_cost"]
+        monthly_episodes = summary["monthly_episodes"]
         if monthly_episodes > 0:
-            print(f"Month to date ({current_month}):")
+            print(f"Month to date ({summary['month']}):")
             print(f"  Episodes: {monthly_episodes}")
             print(f"  Cost: ${monthly_total:.2f}")
             print(f"  Avg per episode: ${monthly_total/monthly_episodes:.3f}")
             print()
 
         # All-time total
-        all_time_cost = sum(data["cost"] for data in totals.values())
-        all_time_episodes = sum(data["episodes"] for data in totals.values())
+        all_time_cost = summary["all_time_cost"]
+        all_time_episodes = summary["all_time_episodes"]
         if all_time_episodes > 0:
             print(f"All time:")
             print(f"  Episodes: {all_time_episodes}")
@@ -79,12 +143,12 @@ def main():
         print("Recent episode costs:")
         print()
 
-        with open(cost_log, 'r') as f:
-            lines = f.readlines()
-
-        # If tail specified, show only last N lines
-        if tail_lines:
-            lines = lines[-tail_lines:]
+        # If tail specified, read only the last N lines
+        if tail:
+            lines = tail_lines(cost_log, tail)
+        else:
+            with open(cost_log, 'r') as f:
+                lines = f.readlines()
 
         # Print the lines
         for line in lines:
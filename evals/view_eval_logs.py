@@ -5,11 +5,49 @@ View evaluation results and trends from log files
 Usage: python3 evals/view_eval_logs.py [health|quality|performance|duplicates|summary] [--tail N]
 """
 
+import io
+import os
 import sys
-import json
 from pathlib import Path
 from datetime import datetime
-from collections import defaultdict
+from collections import defaultdict, deque
+
+# Add project root to path for imports
+sys.path.insert(0, str(Path(__file__).parents[1]))
+
+from utils.json_utils import loads_json
+
+ENTRY_SEPARATOR = '=' * 60
+# Block size for reading a text log backwards in view_text_log --tail
+TAIL_CHUNK_BYTES = 64 * 1024
+
+def tail_entries(log_file: Path, n: int) -> list:
+    """
+    Last n non-empty entries of a text log split on ENTRY_SEPARATOR, stripped,
+    reading backwards from the end until enough complete entries are in memory
+    """
+    sep = ENTRY_SEPARATOR.encode()
+    with open(log_file, 'rb') as f:
+        pos = f.seek(0, os.SEEK_END)
+        buf = b''
+        while True:
+            step = min(TAIL_CHUNK_BYTES, pos)
+            pos -= step
+            f.seek(pos)
+            buf = f.read(step) + buf
+            if pos == 0:
+                pieces = buf.split(sep)
+                break
+            # Start at a line boundary so separators line up as in a full split,
+            # and drop the piece before the first one since it may be cut off
+            if b'\n' in buf and buf.count(sep) > n:
+                pieces = buf[buf.index(b'\n') + 1:].split(sep)[1:]
+                if sum(1 for piece in pieces if piece.strip()) >= n:
+                    break
+
+    # Decode as text mode would, with universal newlines
+    entries = (io.StringIO(piece.decode('utf-8'), newline=None).read().strip() for piece in pieces)
+    return [entry for entry in entries if entry][-n:]
 
 def view_text_log(log_file: Path, tail_lines: int = None):
     """View a text-based log file"""
@@ -20,23 +58,30 @@ def view_text_log(log_file: Path, tail_lines: int = None):
     print(f"📋 {log_file.name}")
     print("=" * 60)
     
-    with open(log_file, 'r', encoding='utf-8') as f:
-        content = f.read()
-    
     if tail_lines:
         # Show only recent entries
-        entries = content.split('=' * 60)
-        entries = [entry.strip() for entry in entries if entry.strip()]
+        recent_entries = tail_entries(log_file, tail_lines)
         
-        if entries:
-            recent_entries = entries[-tail_lines:]
+        if recent_entries:
             for entry in recent_entries:
                 print('=' * 60)
                 print(entry)
         else:
             print("No entries found")
     else:
-        print(content)
+        with open(log_file, 'r', encoding='utf-8') as f:
+            print(f.read())
+
+def load_summaries(log_file: Path, limit: int = 100) -> list:
+    """Read the last `limit` entries of eval_summary.jsonl (one JSON object per line)"""
+    with open(log_file, 'r') as f:
+        lines = deque((line for line in f if line.strip()), maxlen=limit)
+    return [loads_json(line) for line in lines]
+
+def count_summaries(log_file: Path) -> int:
+    """Count eval_summary.jsonl entries without parsing them"""
+    with open(log_file, 'rb') as f:
+        return sum(1 for line in f if line.strip())
 
 def view_summary_log(log_file: Path, tail_entries: int = None):
     """View the JSON summary log with trend analysis"""
@@ -45,8 +90,7 @@ def view_summary_log(log_file: Path, tail_entries: int = None):
         return
     
     try:
-        with open(log_file, 'r') as f:
-            summaries = json.load(f)
+        summaries = load_summaries(log_file)
     except Exception as e:
         print(f"❌ Failed to read summary log: {e}")
         return
@@ -84,30 +128,45 @@ def view_summary_log(log_file: Path, tail_entries: int = None):
         print("\n📈 Trends Analysis:")
         print("-" * 40)
         
+        # One pass over the last 10 runs gathers every section's sums
+        health_runs = healthy_total = warnings_total = 0
+        quality_runs = quality_issues_total = length_runs = length_total = 0
+        perf_runs = success_total = 0
+        recent_issues = []
+        for s in summaries[-10:]:
+            if s.get('feeds_checked', 0) > 0:
+                health_runs += 1
+                healthy_total += s.get('feeds_healthy', 0)
+                warnings_total += s.get('feeds_with_warnings', 0)
+            if s.get('episodes_analyzed', 0) > 0:
+                quality_runs += 1
+                quality_issues_total += s.get('quality_issues', 0)
+                if s.get('avg_summary_length'):
+                    length_runs += 1
+                    length_total += s['avg_summary_length']
+            if s.get('processing_success_rate') is not None:
+                perf_runs += 1
+                success_total += s['processing_success_rate']
+            recent_issues.append(s.get('total_issues', 0))
+        
         # Health trends
-        recent_health = [s for s in summaries[-10:] if s.get('feeds_checked', 0) > 0]
-        if recent_health:
-            avg_healthy = sum(s.get('feeds_healthy', 0) for s in recent_health) / len(recent_health)
-            avg_warnings = sum(s.get('feeds_with_warnings', 0) for s in recent_health) / len(recent_health)
+        if health_runs:
+            avg_healthy = healthy_total / health_runs
+            avg_warnings = warnings_total / health_runs
             print(f"Feed Health: {avg_healthy:.1f} healthy, {avg_warnings:.1f} warnings (avg last 10 runs)")
         
         # Quality trends
-        recent_quality = [s for s in summaries[-10:] if s.get('episodes_analyzed', 0) > 0]
-        if recent_quality:
-            avg_issues = sum(s.get('quality_issues', 0) for s in recent_quality) / len(recent_quality)
-            avg_length = sum(s.get('avg_summary_length', 0) for s in recent_quality if s.get('avg_summary_length'))
-            if avg_length:
-                avg_length = avg_length / len([s for s in recent_quality if s.get('avg_summary_length')])
-                print(f"Quality: {avg_issues:.1f} issues, {avg_length:.0f} words (avg)")
+        if quality_runs and length_total:
+            avg_issues = quality_issues_total / quality_runs
+            avg_length = length_total / length_runs
+            print(f"Quality: {avg_issues:.1f} issues, {avg_length:.0f} words (avg)")
         
         # Performance trends
-        recent_perf = [s for s in summaries[-10:] if s.get('processing_success_rate') is not None]
-        if recent_perf:
-            avg_success = sum(s.get('processing_success_rate', 0) for s in recent_perf) / len(recent_perf)
+        if perf_runs:
+            avg_success = success_total / perf_runs
             print(f"Performance: {avg_success:.1f}% success rate (avg)")
         
         # Issue trends
-        recent_issues = [s.get('total_issues', 0) for s in summaries[-10:]]
         if recent_issues:
             avg_issues = sum(recent_issues) / len(recent_issues)
             trend = "📈" if recent_issues[-1] > avg_issues else "📉" if recent_issues[-1] < avg_issues else "➡️"
@@ -144,7 +203,12 @@ def list_log_files():
     project_root = Path(__file__).parents[1]
     logs_dir = project_root / 'logs'
     
-    eval_logs = list(logs_dir.glob('eval_*.log')) + list(logs_dir.glob('eval_*.json'))
+    # One directory scan; scandir entries carry the name and cache the stat
+    eval_logs = []
+    if logs_dir.is_dir():
+        with os.scandir(logs_dir) as it:
+            eval_logs = [entry for entry in it
+                         if entry.name.startswith('eval_') and entry.name.endswith(('.log', '.jsonl'))]
     
     if not eval_logs:
         print("📭 No evaluation logs found yet")
@@ -154,21 +218,19 @@ def list_log_files():
     print("📁 Available Evaluation Logs:")
     print("-" * 40)
     
-    for log_file in sorted(eval_logs):
-        if log_file.suffix == '.json':
+    for entry in sorted(eval_logs, key=lambda entry: entry.name):
+        if entry.name.endswith('.jsonl'):
             try:
-                with open(log_file, 'r') as f:
-                    data = json.load(f)
-                    entries = len(data) if isinstance(data, list) else 1
-                print(f"📊 {log_file.name:20} → {entries} entries")
+                entries = count_summaries(Path(entry.path))
+                print(f"📊 {entry.name:20} → {entries} entries")
             except:
-                print(f"📊 {log_file.name:20} → (error reading)")
+                print(f"📊 {entry.name:20} → (error reading)")
         else:
             try:
-                size_kb = log_file.stat().st_size / 1024
-                print(f"📋 {log_file.name:20} → {size_kb:.1f} KB")
+                size_kb = entry.stat().st_size / 1024
+                print(f"📋 {entry.name:20} → {size_kb:.1f} KB")
             except:
-                print(f"📋 {log_file.name:20} → (error reading)")
+                print(f"📋 {entry.name:20} → (error reading)")
 
 def main():
     # Parse arguments
@@ -204,7 +266,7 @@ def main():
     
     # View specific log
     if log_type == 'summary':
-        log_file = logs_dir / 'eval_summary.json'
+        log_file = logs_dir / 'eval_summary.jsonl'
         view_summary_log(log_file, tail_lines)
     else:
         log_file = logs_dir / f'eval_{log_type}.log'
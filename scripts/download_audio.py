@@ -1,24 +1,63 @@
 import os
 import sys
 import re
+import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# Make "utils" importable when run standalone
+sys.path.append(str(Path(__file__).resolve().parents[1]))
 import requests
+import urllib3
+from utils.http_client import session
+
+_SLUG_RE = re.compile(r"[^A-Za-z0-9._-]+")
+
+# Copy buffer for audio downloads: few large reads instead of many 8 KB chunks
+COPY_BUFSIZE = 1024 * 1024
+# Attempts per download; later attempts resume with a Range request
+DOWNLOAD_ATTEMPTS = 3
+# Concurrent downloads in download_many (the shared session pools enough connections)
+DOWNLOAD_WORKERS = 8
 
 def slugify(s: str) -> str:
-    return re.sub(r"[^A-Za-z0-9._-]+", "_", s).strip("_")[:120]
+    return _SLUG_RE.sub("_", s).strip("_")[:120]
 
 def download_mp3(url: str, out_dir: str, filename_base: str = "episode"):
     os.makedirs(out_dir, exist_ok=True)
     fname = f"{slugify(filename_base)}.mp3"
     path = os.path.join(out_dir, fname)
 
-    headers = {"User-Agent": "Mozilla/5.0"}
-    with requests.get(url, headers=headers, stream=True, allow_redirects=True) as r:
-        r.raise_for_status()
-        with open(path, "wb") as f:
-            for chunk in r.iter_content(chunk_size=8192):
-                if chunk:
-                    f.write(chunk)
-    return path
+    # The session retries failed connects and 502/503/504; a connection lost
+    # mid-body is retried here, asking only for the bytes not yet written
+    written = 0
+    for attempt in range(1, DOWNLOAD_ATTEMPTS + 1):
+        headers = {"Range": f"bytes={written}-", "Accept-Encoding": "identity"} if written else None
+        try:
+            with session.get(url, stream=True, allow_redirects=True, headers=headers) as r:
+                r.raise_for_status()
+                # A server that ignores Range sends the whole file again (200)
+                resume = written and r.status_code == 206
+                # Let urllib3 undo any Content-Encoding, as iter_content did
+                r.raw.decode_content = True
+                with open(path, "ab" if resume else "wb") as f:
+                    shutil.copyfileobj(r.raw, f, COPY_BUFSIZE)
+            return path
+        except (requests.ConnectionError, requests.Timeout, urllib3.exceptions.HTTPError):
+            if attempt == DOWNLOAD_ATTEMPTS:
+                raise
+            written = os.path.getsize(path) if os.path.exists(path) else 0
+            time.sleep(attempt)
+
+def download_many(jobs, out_dir: str, max_workers: int = DOWNLOAD_WORKERS) -> list:
+    """
+    Download several (url, filename_base) pairs concurrently, overlapping their
+    network latency. Returns the saved paths in job order; the first failed
+    download's exception is raised.
+    """
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(lambda job: download_mp3(job[0], out_dir, job[1]), jobs))
 
 if __name__ == "__main__":
     if len(sys.argv) < 4:
@@ -6,44 +6,34 @@ import pathlib
 
 def download_youtube_audio(url: str, output_dir: str, base_name: str) -> str:
     """
-    Download YouTube video and extract audio as MP3 using yt-dlp.
-    Returns path to the downloaded MP3 file.
+    Download the best audio stream of a YouTube video using yt-dlp, kept in its
+    native container (m4a/webm); Whisper decodes it directly, so there is no
+    MP3 transcode pass.
+    Returns path to the downloaded audio file.
     """
     out_dir = pathlib.Path(output_dir)
     out_dir.mkdir(parents=True, exist_ok=True)
 
-    # Output template
-    output_template = str(out_dir / f"{base_name}.mp3")
+    # Output template; yt-dlp fills in the stream's extension
+    output_template = str(out_dir / f"{base_name}.%(ext)s")
 
-    # yt-dlp command: download best audio, convert to mp3
+    # yt-dlp command: download best audio, print the final path when done
     cmd = [
         "yt-dlp",
         "-f", "bestaudio",
-        "--extract-audio",
-        "--audio-format", "mp3",
-        "--audio-quality", "0",  # Best quality
         "-o", output_template,
+        "--print", "after_move:filepath",
         url
     ]
 
     try:
-        subprocess.run(cmd, check=True, capture_output=True, text=True)
-
-        # yt-dlp might add .mp3 extension, verify file exists
-        if os.path.exists(output_template):
-            return output_template
-
-        # Check if yt-dlp created file with different extension handling
-        possible_paths = [
-            output_template,
-            output_template + ".mp3"
-        ]
-
-        for path in possible_paths:
-            if os.path.exists(path):
-                return path
-
-        raise FileNotFoundError(f"Downloaded file not found at expected location: {output_template}")
-
+        # --print implies --quiet, so stdout is just the path; stderr is kept for the error message
+        result = subprocess.run(cmd, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
     except subprocess.CalledProcessError as e:
         raise RuntimeError(f"yt-dlp failed: {e.stderr}")
+
+    lines = result.stdout.strip().splitlines()
+    path = lines[-1] if lines else ""
+    if not path or not os.path.exists(path):
+        raise FileNotFoundError(f"Downloaded file not found at expected location: {output_template}")
+    return path
@@ -6,9 +6,53 @@ Identifies major topic transitions and creates timestamped chapters
 
 import os
 import re
-import anthropic
+import sys
 from pathlib import Path
 
+# Make "utils" importable when run standalone
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from utils.rate_limits import create_message, get_client
+from utils.response_cache import load_response, save_response
+
+CHAPTER_MODEL = "claude-3-5-haiku-20241022"  # Using cheaper model
+CHAPTER_MAX_TOKENS = 800
+
+# Whisper segment timestamps, [MM:SS.SS --> MM:SS.SS] or seconds-only
+_SEGMENT_RE = re.compile(r'\[([0-9:\.]+) --> ([0-9:\.]+)\]')
+# Chapter timestamps from Claude, MM:SS or HH:MM:SS
+_CHAPTER_TS_RE = re.compile(r'(?:(\d+):)?(\d+):(\d+)')
+
+TRANSLATION_HEADER = "Here's the English translation:"
+# Transcript characters sent to Claude for chapter titles
+TRANSCRIPT_PROMPT_CHARS = 10000
+# The last segment is looked for in this many trailing bytes before reading the whole file
+DURATION_TAIL_BYTES = 8192
+
+# Constant parts of the chapter prompt, around the episode duration
+_CHAPTER_PROMPT_HEAD = """Analyze this podcast transcript and create exactly 6 chapter titles that represent the main topic flow.
+
+Episode duration: """
+_CHAPTER_PROMPT_BODY = """ minutes
+
+Create 6 concise chapter titles (3-8 words each) that capture the major topics and logical flow of the episode.
+
+Format each chapter like this:
+CHAPTER: Chapter Title Here
+
+Example:
+CHAPTER: Introduction and Context Setting
+CHAPTER: Core Problem Definition
+CHAPTER: Solution Framework Discussion
+CHAPTER: Implementation Strategies
+CHAPTER: Case Studies and Examples
+CHAPTER: Key Takeaways and Next Steps
+
+Make the titles descriptive and flow logically from one to the next.
+
+Transcript:
+
+"""
+
 def seconds_to_mmss(seconds):
     """Convert seconds to MM:SS format"""
     try:
@@ -28,58 +72,44 @@ def fix_timestamp_format(timestamp, episode_duration_minutes=None):
         if ':' not in timestamp:
             return seconds_to_mmss(float(timestamp))
 
-        # Handle invalid MM:SS format (like "77:92" -> "78:32")
-        if timestamp.count(':') == 1:
-            parts = timestamp.split(':')
-            if len(parts) == 2:
-                minutes = int(parts[0])
-                seconds = int(parts[1])
-
-                # Check if this timestamp is likely in seconds format
-                should_convert_to_seconds = False
-
-                # Case 1: Invalid seconds (>= 60)
-                if seconds >= 60:
-                    should_convert_to_seconds = True
-
-                # Case 2: Minutes exceed episode duration (likely seconds format)
-                elif episode_duration_minutes and minutes > episode_duration_minutes:
-                    should_convert_to_seconds = True
-
-                # Case 3: Very high minutes with :00 seconds (likely seconds format)
-                elif minutes > 60 and seconds == 0:
-                    should_convert_to_seconds = True
-
-                if should_convert_to_seconds:
-                    # For timestamps that exceed episode duration, treat first part as seconds
-                    # e.g., "151:50" in 96-min episode -> treat 151 as seconds -> "02:31"
-                    return seconds_to_mmss(minutes)
-                else:
-                    # Fix invalid seconds only
-                    if seconds >= 60:
-                        extra_minutes = seconds // 60
-                        seconds = seconds % 60
-                        minutes += extra_minutes
-
-                    return f"{minutes:02d}:{seconds:02d}"
-
-        # Handle HH:MM:SS format - convert to MM:SS
-        if timestamp.count(':') == 2:
-            parts = timestamp.split(':')
-            if len(parts) == 3:
-                hours = int(parts[0])
-                minutes = int(parts[1]) + (hours * 60)
-                seconds = int(parts[2])
-
-                # Fix invalid seconds
-                if seconds >= 60:
-                    extra_minutes = seconds // 60
-                    seconds = seconds % 60
-                    minutes += extra_minutes
-
-                return f"{minutes:02d}:{seconds:02d}"
-
-        return timestamp  # Return original if no conversion needed
+        m = _CHAPTER_TS_RE.fullmatch(timestamp)
+        if not m:
+            return timestamp  # Return original if no conversion needed
+        hours, minutes, seconds = m.groups()
+        minutes = int(minutes)
+        seconds = int(seconds)
+
+        if hours is None:
+            # Handle invalid MM:SS format (like "77:92" -> "78:32")
+            # Check if this timestamp is likely in seconds format
+            should_convert_to_seconds = False
+
+            # Case 1: Invalid seconds (>= 60)
+            if seconds >= 60:
+                should_convert_to_seconds = True
+
+            # Case 2: Minutes exceed episode duration (likely seconds format)
+            elif episode_duration_minutes and minutes > episode_duration_minutes:
+                should_convert_to_seconds = True
+
+            # Case 3: Very high minutes with :00 seconds (likely seconds format)
+            elif minutes > 60 and seconds == 0:
+                should_convert_to_seconds = True
+
+            if should_convert_to_seconds:
+                # For timestamps that exceed episode duration, treat first part as seconds
+                # e.g., "151:50" in 96-min episode -> treat 151 as seconds -> "02:31"
+                return seconds_to_mmss(minutes)
+        else:
+            # Handle HH:MM:SS format - convert to MM:SS
+            minutes += int(hours) * 60
+
+            # Fix invalid seconds
+            if seconds >= 60:
+                minutes += seconds // 60
+                seconds = seconds % 60
+
+        return f"{minutes:02d}:{seconds:02d}"
     except (ValueError, IndexError):
         return timestamp  # Return original if parsing fails
 
@@ -89,15 +119,31 @@ def get_episode_duration(transcript_path):
     Returns duration in minutes or None if not found
     """
     try:
-        with open(transcript_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-
-        # Skip translation header if present
-        if content.startswith("Here's the English translation:"):
-            content = content.split('\n', 1)[1] if '\n' in content else content
-
-        # Find all timestamps in format [MM:SS.SS --> MM:SS.SS] or [HH:MM:SS.SS --> HH:MM:SS.SS]
-        timestamps = re.findall(r'\[([0-9:\.]+) --> ([0-9:\.]+)\]', content)
+        with open(transcript_path, 'rb') as f:
+            size = f.seek(0, os.SEEK_END)
+            timestamps = None
+            # Segments are in time order, so the last one is normally in the tail
+            offset = max(0, size - DURATION_TAIL_BYTES)
+            while not timestamps:
+                f.seek(offset)
+                # The tail may start inside a multi-byte character; timestamps are ASCII
+                content = f.read().decode('utf-8', errors='ignore' if offset else 'strict')
+
+                # Skip translation header if present
+                if offset == 0 and content.startswith(TRANSLATION_HEADER):
+                    content = content.split('\n', 1)[1] if '\n' in content else content
+
+                # Find the last timestamp in format [MM:SS.SS --> MM:SS.SS] or [HH:MM:SS.SS --> HH:MM:SS.SS],
+                # scanning lines from the end instead of collecting every segment
+                end = len(content)
+                while end >= 0 and not timestamps:
+                    start = content.rfind('\n', 0, end) + 1
+                    timestamps = _SEGMENT_RE.findall(content, start, end)
+                    end = start - 1
+
+                if offset == 0:
+                    break
+                offset = 0  # No segment in the tail: search the whole file
 
         if not timestamps:
             return None
@@ -132,18 +178,20 @@ def create_simple_chapters(duration_minutes, num_chapters=6):
     # Just return the number of chapters to create
     return num_chapters
 
-def extract_chapters(transcript_path, min_duration_minutes=45):
+def extract_chapters(transcript_path, min_duration_minutes=45, duration=None):
     """
     Extract chapter information from transcript if episode is long enough
     Returns list of chapter objects or None if too short
+    Pass duration (minutes) when the caller already has it
     """
-    # For translated transcripts, check original for duration
-    original_path = transcript_path
-    if transcript_path.endswith('_translated.txt'):
-        original_path = transcript_path.replace('_translated.txt', '.txt')
+    if duration is None:
+        # For translated transcripts, check original for duration
+        original_path = transcript_path
+        if transcript_path.endswith('_translated.txt'):
+            original_path = transcript_path.replace('_translated.txt', '.txt')
 
-    # Check episode duration first (using original transcript)
-    duration = get_episode_duration(original_path)
+        # Check episode duration first (using original transcript)
+        duration = get_episode_duration(original_path)
     if duration is None:
         print("Could not determine episode duration - skipping chapter extraction")
         return None
@@ -155,54 +203,39 @@ def extract_chapters(transcript_path, min_duration_minutes=45):
 
     # Read transcript (use the provided path for content)
     try:
+        # Read only the part of the transcript that goes into the prompt
         with open(transcript_path, 'r', encoding='utf-8') as f:
-            transcript_text = f.read()
+            transcript_text = f.readline()
 
-        # Skip translation header if present
-        if transcript_text.startswith("Here's the English translation:"):
-            transcript_text = transcript_text.split('\n', 1)[1] if '\n' in transcript_text else transcript_text
+            # Skip translation header if present
+            if transcript_text.startswith(TRANSLATION_HEADER) and transcript_text.endswith('\n'):
+                transcript_text = ""
+            transcript_text += f.read(TRANSCRIPT_PROMPT_CHARS)
 
     except Exception as e:
         print(f"Error reading transcript: {e}")
         return None
 
-    client = anthropic.Client()
+    client = get_client()
 
     # Check if this is a translated (potentially truncated) transcript
     is_translated = transcript_path.endswith('_translated.txt')
 
     # Create a simple prompt for chapter titles only
-    prompt = f"""Analyze this podcast transcript and create exactly 6 chapter titles that represent the main topic flow.
-
-Episode duration: {duration:.0f} minutes
-
-Create 6 concise chapter titles (3-8 words each) that capture the major topics and logical flow of the episode.
-
-Format each chapter like this:
-CHAPTER: Chapter Title Here
-
-Example:
-CHAPTER: Introduction and Context Setting
-CHAPTER: Core Problem Definition
-CHAPTER: Solution Framework Discussion
-CHAPTER: Implementation Strategies
-CHAPTER: Case Studies and Examples
-CHAPTER: Key Takeaways and Next Steps
-
-Make the titles descriptive and flow logically from one to the next.
-
-Transcript:
-
-{transcript_text[:10000]}"""
+    prompt = f"{_CHAPTER_PROMPT_HEAD}{duration:.0f}{_CHAPTER_PROMPT_BODY}{transcript_text[:TRANSCRIPT_PROMPT_CHARS]}"
 
     try:
-        response = client.messages.create(
-            model="claude-3-5-haiku-20241022",  # Using cheaper model
-            max_tokens=800,
-            messages=[{"role": "user", "content": prompt}]
-        )
-
-        response_text = response.content[0].text.strip()
+        # Same transcript excerpt and prompt give the same titles; reuse them on re-runs
+        response_text = load_response(CHAPTER_MODEL, CHAPTER_MAX_TOKENS, prompt)
+        if response_text is None:
+            response = create_message(
+                client,
+                model=CHAPTER_MODEL,
+                max_tokens=CHAPTER_MAX_TOKENS,
+                messages=[{"role": "user", "content": prompt}]
+            )
+            response_text = response.content[0].text.strip()
+            save_response(CHAPTER_MODEL, CHAPTER_MAX_TOKENS, prompt, response_text)
 
         # Parse chapters
         chapters = []
@@ -5,31 +5,20 @@ Extracts memorable quotes from podcast transcripts
 """
 
 import os
+import sys
 import json
-import anthropic
 from pathlib import Path
 
-def extract_quotes(transcript_path):
-    """
-    Extract 3-5 memorable quotes from a transcript
-    Returns list of quote objects
-    """
-    # Read the transcript
-    try:
-        with open(transcript_path, 'r', encoding='utf-8') as f:
-            transcript_text = f.read()
-    except Exception as e:
-        print(f"Error reading transcript {transcript_path}: {e}")
-        return []
-
-    # Skip if transcript is too short
-    if len(transcript_text) < 500:
-        print("Transcript too short for quote extraction")
-        return []
+# Make "utils" importable when run standalone
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from utils.rate_limits import create_message, get_client
+from utils.response_cache import load_response, save_response
 
-    client = anthropic.Client()
+QUOTE_MODEL = "claude-3-5-haiku-20241022"  # Using cheaper model for quotes
+QUOTE_MAX_TOKENS = 1000
 
-    prompt = f"""Extract 3-5 memorable quotes from this podcast transcript.
+# Constant instructions of the quote prompt; the transcript excerpt is appended
+_QUOTE_PROMPT_PREFIX = """Extract 3-5 memorable quotes from this podcast transcript.
 
 Look for:
 - Profound insights or actionable advice
@@ -48,16 +37,45 @@ CONTEXT: Discussing product-market fit
 
 Transcript:
 
-{transcript_text[:8000]}"""  # Limit to first 8000 chars for cost efficiency
+"""
+
+# Transcript characters sent to Claude (for cost efficiency)
+TRANSCRIPT_PROMPT_CHARS = 8000
 
+def extract_quotes(transcript_path):
+    """
+    Extract 3-5 memorable quotes from a transcript
+    Returns list of quote objects
+    """
+    # Read only the part of the transcript that goes into the prompt
     try:
-        response = client.messages.create(
-            model="claude-3-5-haiku-20241022",  # Using cheaper model for quotes
-            max_tokens=1000,
-            messages=[{"role": "user", "content": prompt}]
-        )
+        with open(transcript_path, 'r', encoding='utf-8') as f:
+            transcript_text = f.read(TRANSCRIPT_PROMPT_CHARS)
+    except Exception as e:
+        print(f"Error reading transcript {transcript_path}: {e}")
+        return []
 
-        response_text = response.content[0].text.strip()
+    # Skip if transcript is too short
+    if len(transcript_text) < 500:
+        print("Transcript too short for quote extraction")
+        return []
+
+    client = get_client()
+
+    prompt = _QUOTE_PROMPT_PREFIX + transcript_text
+
+    try:
+        # Same transcript excerpt and prompt give the same quotes; reuse them on re-runs
+        response_text = load_response(QUOTE_MODEL, QUOTE_MAX_TOKENS, prompt)
+        if response_text is None:
+            response = create_message(
+                client,
+                model=QUOTE_MODEL,
+                max_tokens=QUOTE_MAX_TOKENS,
+                messages=[{"role": "user", "content": prompt}]
+            )
+            response_text = response.content[0].text.strip()
+            save_response(QUOTE_MODEL, QUOTE_MAX_TOKENS, prompt, response_text)
 
         # Parse the structured text format
         quotes = []
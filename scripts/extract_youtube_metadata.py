@@ -2,34 +2,102 @@
 
 import subprocess
 import json
+import re
+import threading
+from urllib.parse import urlparse, parse_qs
 
-def get_youtube_metadata(url: str) -> dict:
+try:
+    # Optional: run yt-dlp in-process, without a Python start-up and extractor
+    # import per video; falls back to the yt-dlp executable
+    from yt_dlp import YoutubeDL
+    from yt_dlp.utils import DownloadError
+except ImportError:
+    YoutubeDL = None
+
+_VIDEO_ID_RE = re.compile(r"^[A-Za-z0-9_-]{11}$")
+
+# In-process equivalent of the CLI flags used in _dump_json_cli
+_YDL_OPTIONS = {
+    "quiet": True,
+    "no_warnings": True,
+    "skip_download": True,
+    "noplaylist": True,
+    "check_formats": False,
+    "extractor_args": {"youtube": {"player_skip": ["webpage", "configs"]}},
+}
+_ydl = None
+_ydl_lock = threading.Lock()
+
+def youtube_id_from_url(url: str):
     """
-    Extract metadata from YouTube video using yt-dlp.
-    Returns dict with title, channel, upload_date, description, id.
+    Extract the video id from common YouTube URL forms without a network call:
+    watch?v=<id>, youtu.be/<id>, /shorts/<id>, /embed/<id>, /live/<id>.
+    Returns None for unrecognized URLs.
     """
+    parsed = urlparse(url.strip())
+    host = (parsed.hostname or "").lower()
+    candidate = None
+
+    if host == "youtu.be" or host.endswith(".youtu.be"):
+        candidate = parsed.path.lstrip("/").split("/")[0]
+    elif host == "youtube.com" or host.endswith(".youtube.com"):
+        if parsed.path == "/watch":
+            candidate = parse_qs(parsed.query).get("v", [None])[0]
+        else:
+            parts = parsed.path.strip("/").split("/")
+            if len(parts) >= 2 and parts[0] in ("shorts", "embed", "live", "v"):
+                candidate = parts[1]
+
+    if candidate and _VIDEO_ID_RE.match(candidate):
+        return candidate
+    return None
+
+def _dump_json_cli(url: str) -> dict:
+    """Run the yt-dlp executable once for url and parse its --dump-json output"""
+    # Only player-response fields are needed: skip the watch page and client
+    # config requests, format probing, and any playlist the URL points into
     cmd = [
         "yt-dlp",
         "--dump-json",
         "--no-download",
+        "--no-playlist",
+        "--no-check-formats",
+        "--extractor-args", "youtube:player_skip=webpage,configs",
         url
     ]
 
     try:
         result = subprocess.run(cmd, check=True, capture_output=True, text=True)
-        data = json.loads(result.stdout)
-
-        return {
-            "id": data.get("id"),
-            "title": data.get("title"),
-            "channel": data.get("uploader") or data.get("channel"),
-            "upload_date": data.get("upload_date"),  # Format: YYYYMMDD
-            "description": data.get("description"),
-            "url": data.get("webpage_url") or url,
-            "duration": data.get("duration")  # seconds
-        }
-
+        return json.loads(result.stdout)
     except subprocess.CalledProcessError as e:
         raise RuntimeError(f"Failed to extract YouTube metadata: {e.stderr}")
     except json.JSONDecodeError as e:
         raise RuntimeError(f"Failed to parse YouTube metadata JSON: {e}")
+
+def _extract_info_inprocess(url: str) -> dict:
+    """Same lookup through one YoutubeDL instance kept for the life of the process"""
+    global _ydl
+    with _ydl_lock:
+        if _ydl is None:
+            _ydl = YoutubeDL(_YDL_OPTIONS)
+        try:
+            return _ydl.extract_info(url, download=False)
+        except DownloadError as e:
+            raise RuntimeError(f"Failed to extract YouTube metadata: {e}")
+
+def get_youtube_metadata(url: str) -> dict:
+    """
+    Extract metadata from YouTube video using yt-dlp.
+    Returns dict with title, channel, upload_date, description, id.
+    """
+    data = _extract_info_inprocess(url) if YoutubeDL else _dump_json_cli(url)
+
+    return {
+        "id": data.get("id"),
+        "title": data.get("title"),
+        "channel": data.get("uploader") or data.get("channel"),
+        "upload_date": data.get("upload_date"),  # Format: YYYYMMDD
+        "description": data.get("description"),
+        "url": data.get("webpage_url") or url,
+        "duration": data.get("duration")  # seconds
+    }
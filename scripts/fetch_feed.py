@@ -1,8 +1,228 @@
+import os
+import sys
+import hashlib
+import threading
 import feedparser
+import xml.etree.ElementTree as ET
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from pathlib import Path
 
-def get_latest_episode(feed_url: str):
-    feed = feedparser.parse(feed_url)
+# Make "utils" importable when run standalone
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from utils.http_client import session
+from utils.json_utils import atomic_write_json, loads_json
+
+# Feed bodies are streamed and refused past this size (FEED_MAX_BYTES env)
+MAX_FEED_BYTES = int(os.getenv("FEED_MAX_BYTES", str(10 * 1024 * 1024)))
+CHUNK_SIZE = 64 * 1024
+
+# Namespaces whose elements make up an item in RSS 2.0, RSS 1.0 and Atom
+# (extension elements such as itunes:title are ignored by the fast path)
+_ITEM_NAMESPACES = ("", "{http://purl.org/rss/1.0/}", "{http://www.w3.org/2005/Atom}")
+_ITEM_FIELDS = ("title", "link", "guid", "id", "pubDate", "published")
+
+class FeedTooLarge(Exception):
+    pass
+
+def _iter_body(r, buf: bytearray):
+    """
+    Yield a streamed response body chunk by chunk, appending each chunk to buf;
+    oversized feeds are rejected without buffering them
+    """
+    length = r.headers.get("Content-Length")
+    if length and length.isdigit() and int(length) > MAX_FEED_BYTES:
+        raise FeedTooLarge(f"Feed is {int(length)} bytes (limit {MAX_FEED_BYTES})")
+
+    for chunk in r.iter_content(CHUNK_SIZE):
+        buf.extend(chunk)
+        if len(buf) > MAX_FEED_BYTES:
+            raise FeedTooLarge(f"Feed exceeds {MAX_FEED_BYTES} bytes")
+        yield chunk
+
+def fetch_feed_body(feed_url: str, timeout: int = 30, headers: dict = None):
+    """
+    GET a feed over the shared session, streaming the body so oversized
+    feeds are rejected without buffering them. Returns (response, body bytes).
+    """
+    with session.get(feed_url, timeout=timeout, headers=headers, stream=True) as r:
+        buf = bytearray()
+        for _ in _iter_body(r, buf):
+            pass
+    return r, bytes(buf)
+
+# Parsed feeds keyed by a hash of the raw body, so identical bodies fetched
+# again in the same process (health checks, pipeline runs) skip the XML parse.
+# Callers must treat the returned feed as read-only.
+PARSE_CACHE_SIZE = 32
+_parse_cache = OrderedDict()
+_parse_cache_lock = threading.Lock()
+
+def parse_feed(body: bytes):
+    """feedparser.parse with a small LRU cache keyed on the body's blake2b digest"""
+    digest = hashlib.blake2b(body, digest_size=16).digest()
+    with _parse_cache_lock:
+        feed = _parse_cache.get(digest)
+        if feed is not None:
+            _parse_cache.move_to_end(digest)
+            return feed
+
+    feed = feedparser.parse(body)
+    with _parse_cache_lock:
+        _parse_cache[digest] = feed
+        while len(_parse_cache) > PARSE_CACHE_SIZE:
+            _parse_cache.popitem(last=False)
+    return feed
+
+# Validators (ETag/Last-Modified) and latest episode per feed URL from the last
+# full response, so an unchanged feed costs one conditional request (HTTP 304)
+EPISODE_CACHE_FILE = Path(__file__).resolve().parents[1] / "data" / "feed_episodes.json"
+_episode_cache = None
+_episode_cache_lock = threading.Lock()
+
+def _cached_episode(feed_url: str):
+    global _episode_cache
+    with _episode_cache_lock:
+        if _episode_cache is None:
+            try:
+                _episode_cache = loads_json(EPISODE_CACHE_FILE.read_bytes())
+            except (OSError, ValueError):
+                _episode_cache = {}
+        return _episode_cache.get(feed_url)
+
+def _store_episode(feed_url: str, r, episode: dict) -> None:
+    etag = r.headers.get("ETag")
+    last_modified = r.headers.get("Last-Modified")
+    if not etag and not last_modified:
+        return
+    with _episode_cache_lock:
+        _episode_cache[feed_url] = {
+            "etag": etag,
+            "last_modified": last_modified,
+            "episode": episode,
+        }
+        try:
+            atomic_write_json(EPISODE_CACHE_FILE, _episode_cache)
+        except OSError:
+            pass  # The cache is an optimization only
+
+def first_item(chunks):
+    """
+    Incrementally parse feed XML chunks and return the first <item>/<entry>
+    element, or None. Stops consuming chunks as soon as that element closes.
+    Raises ET.ParseError on XML that is not well-formed.
+    """
+    parser = ET.XMLPullParser(events=("end",))
+    for chunk in chunks:
+        parser.feed(chunk)
+        for _, elem in parser.read_events():
+            if elem.tag.rpartition("}")[2] in ("item", "entry"):
+                return elem
+    return None
+
+def latest_from_item(item) -> dict:
+    """
+    Latest episode dict, as latest_from_parsed builds it, from a first_item()
+    element. Raises ValueError for anything it does not handle like feedparser.
+    """
+    fields = {}
+    enclosure = None
+    for child in item:
+        ns, _, name = child.tag.rpartition("}")
+        if ns:
+            ns += "}"
+        if ns not in _ITEM_NAMESPACES:
+            continue
+        if name == "link" and ns.endswith("Atom}"):
+            rel = child.get("rel", "alternate")
+            if rel == "enclosure" and enclosure is None:
+                enclosure = child.get("href")
+            elif rel == "alternate":
+                fields.setdefault("link", child.get("href", ""))
+        elif name == "enclosure" and enclosure is None:
+            enclosure = child.get("url")
+        elif name in _ITEM_FIELDS:
+            if len(child):
+                raise ValueError(f"Nested markup in <{name}>")
+            fields.setdefault(name, (child.text or "").strip())
+            if name == "guid" and "permalink" not in fields:
+                fields["permalink"] = child.get("isPermaLink", "true") != "false"
+
+    pub = None
+    date = fields.get("pubDate") or fields.get("published")
+    if date:
+        if "pubDate" in fields:
+            parsed = parsedate_to_datetime(date)  # ValueError if unparseable
+        else:
+            parsed = datetime.fromisoformat(date)
+        if parsed.tzinfo is None:
+            parsed = parsed.replace(tzinfo=timezone.utc)
+        pub = parsed.astimezone(timezone.utc).replace(microsecond=0).isoformat()
+
+    link = fields.get("link", "")
+    if not link and fields.get("permalink"):
+        link = fields["guid"]  # feedparser uses a permalink guid as the link
+    return {
+        "title": fields.get("title", "Untitled"),
+        "link": link,
+        "mp3_url": enclosure,
+        "published": pub,
+        "id": fields.get("guid") or fields.get("id") or link,
+    }
+
+def get_latest_episode(feed_url: str, timeout: int = 30):
+    """
+    Latest episode of a feed. The body is parsed as it streams in and the
+    download stops once the first item is complete; feeds the fast path cannot
+    handle (malformed XML, HTML entities, unusual dates) go through feedparser.
+    Requests are conditional on the validators of the last response, and an
+    unchanged feed (HTTP 304) returns the episode cached from that response.
+    """
+    cached = _cached_episode(feed_url)
+    headers = {}
+    if cached:
+        if cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+        if cached.get("last_modified"):
+            headers["If-Modified-Since"] = cached["last_modified"]
+
+    with session.get(feed_url, timeout=timeout, headers=headers, stream=True) as r:
+        if r.status_code == 304 and cached:
+            return cached["episode"]
+        r.raise_for_status()
+
+        buf = bytearray()
+        chunks = _iter_body(r, buf)
+        episode = None
+        try:
+            item = first_item(chunks)
+            if item is not None:
+                episode = latest_from_item(item)
+        except (ET.ParseError, ValueError, TypeError, IndexError):
+            pass
+
+        if episode is None:
+            # Fall back to the full document
+            for _ in chunks:
+                pass
+            episode = latest_from_parsed(parse_feed(bytes(buf)))
+
+    if episode is not None:
+        _store_episode(feed_url, r, episode)
+    return episode
+
+def get_latest_episodes(feed_urls: list, workers: int = 8, timeout: int = 30) -> list:
+    """
+    get_latest_episode for several feeds, fetched concurrently on a thread pool.
+    Results are in feed_urls order.
+    """
+    with ThreadPoolExecutor(max_workers=workers) as ex:
+        return list(ex.map(lambda url: get_latest_episode(url, timeout=timeout), feed_urls))
+
+def latest_from_parsed(feed):
+    """Latest episode dict from an already parsed feedparser result, or None"""
     if not feed.entries:
         return None
     e = feed.entries[0]
@@ -19,10 +239,9 @@ def get_latest_episode(feed_url: str):
     }
 
 if __name__ == "__main__":
-    import sys
-    url = sys.argv[1] if len(sys.argv) > 1 else None
-    if not url:
-        print("Usage: python3 scripts/fetch_feed.py <RSS_URL>")
+    urls = sys.argv[1:]
+    if not urls:
+        print("Usage: python3 scripts/fetch_feed.py <RSS_URL> [<RSS_URL> ...]")
         sys.exit(1)
-    item = get_latest_episode(url)
-    print(item)
+    for item in get_latest_episodes(urls):
+        print(item)
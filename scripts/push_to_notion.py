@@ -1,13 +1,74 @@
 # scripts/push_to_notion.py
 import os
 import sys
-import json
 import argparse
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 from typing import List, Dict
 from notion_client import Client
+from notion_client.errors import HTTPResponseError
+
+# Make "utils" importable when run standalone
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from utils.json_utils import loads_json
 
 MAX_CHARS = 1800   # safe rich_text size
-BATCH_SIZE = 80    # children per request (API soft cap ~100)
+# Children per request; the API caps appends at 100 (NOTION_BATCH_SIZE env
+# lowers it if large rich-text payloads get rejected)
+BATCH_SIZE = int(os.getenv("NOTION_BATCH_SIZE", "100"))
+
+# One Notion client per token, reused across pushes in the same process
+# so its pooled HTTP connection stays warm
+_CLIENTS: Dict[str, Client] = {}
+
+def get_client(token: str) -> Client:
+    if token not in _CLIENTS:
+        _CLIENTS[token] = Client(auth=token)
+    return _CLIENTS[token]
+
+# ---------- request pacing ----------
+
+# Notion averages ~3 requests/s per integration: requests made through
+# notion_call start at least NOTION_MIN_INTERVAL apart across threads, and
+# 429/502/503 answers are retried with capped exponential backoff and jitter.
+# A gateway error can arrive after a write was applied, so page creates and
+# block appends (idempotent=False) retry only 429
+NOTION_MIN_INTERVAL = 0.35
+NOTION_ATTEMPTS = 4
+RETRY_STATUSES = {429, 502, 503}
+WRITE_RETRY_STATUSES = {429}
+# Old blocks deleted in flight at once when a page is replaced
+DELETE_WORKERS = 3
+_pace_lock = threading.Lock()
+_next_request = 0.0
+
+def _wait_turn():
+    global _next_request
+    with _pace_lock:
+        now = time.monotonic()
+        wait = _next_request - now
+        _next_request = max(now, _next_request) + NOTION_MIN_INTERVAL
+    if wait > 0:
+        time.sleep(wait)
+
+def notion_call(fn, *args, idempotent: bool = True, **kwargs):
+    """Call a notion_client endpoint method paced and retried as above"""
+    retry_statuses = RETRY_STATUSES if idempotent else WRITE_RETRY_STATUSES
+    for attempt in range(1, NOTION_ATTEMPTS + 1):
+        _wait_turn()
+        try:
+            return fn(*args, **kwargs)
+        except HTTPResponseError as e:
+            if e.status not in retry_statuses or attempt == NOTION_ATTEMPTS:
+                raise
+            try:
+                retry_after = float(e.headers.get("retry-after", 0))
+            except (AttributeError, TypeError, ValueError):
+                retry_after = 0
+            time.sleep(retry_after or min(30, 2 ** attempt + random.random()))
 
 # ---------- bold-safe chunking and inline markdown ----------
 
@@ -43,36 +104,23 @@ def _safe_chunks_preserving_bold(s: str, n: int):
         yield chunk
         i = j
 
+# Shared annotation dicts; rich_text entries are only serialized, never mutated
+_PLAIN = {"bold": False, "italic": False, "strikethrough": False,
+          "underline": False, "code": False, "color": "default"}
+_BOLD = dict(_PLAIN, bold=True)
+
 def md_inline_to_rich(text: str):
     """
     Convert **bold** to Notion annotations.
     Assumes chunks do not split a bold span.
     """
     parts = text.split("**")
-    if len(parts) == 1:
-        return [{
-            "type": "text",
-            "text": {"content": text},
-            "annotations": {"bold": False, "italic": False, "strikethrough": False,
-                            "underline": False, "code": False, "color": "default"}
-        }]
-    rich = []
-    for idx, seg in enumerate(parts):
-        if seg == "":
-            continue
-        is_bold = (idx % 2 == 1)
-        rich.append({
-            "type": "text",
-            "text": {"content": seg},
-            "annotations": {"bold": is_bold, "italic": False, "strikethrough": False,
-                            "underline": False, "code": False, "color": "default"}
-        })
-    return rich or [{
-        "type": "text",
-        "text": {"content": text},
-        "annotations": {"bold": False, "italic": False, "strikethrough": False,
-                        "underline": False, "code": False, "color": "default"}
-    }]
+    rich = [
+        {"type": "text", "text": {"content": seg}, "annotations": _BOLD if idx % 2 else _PLAIN}
+        for idx, seg in enumerate(parts)
+        if seg
+    ]
+    return rich or [{"type": "text", "text": {"content": text}, "annotations": _PLAIN}]
 
 # ---------- blocks ----------
 
@@ -104,13 +152,19 @@ def heading_block(level: int, text: str) -> Dict:
     key = "heading_2" if level == 2 else "heading_3"
     return {"object": "block", "type": key, key: {"rich_text": md_inline_to_rich(text)}}
 
+BULLET_PREFIXES = ("- ", "* ")
+
 def md_to_blocks(md: str) -> List[Dict]:
     blocks: List[Dict] = []
     lines = md.splitlines()
+    # Right- and left-stripped forms of every line, computed once
+    rstripped = [ln.rstrip() for ln in lines]
+    lstripped = [ln.lstrip() for ln in lines]
+    n = len(lines)
     i = 0
-    while i < len(lines):
-        line = lines[i].rstrip()
-        if not line.strip():
+    while i < n:
+        line = rstripped[i]
+        if not line:
             i += 1
             continue
         if line.startswith("## "):
@@ -121,20 +175,18 @@ def md_to_blocks(md: str) -> List[Dict]:
             blocks.append(heading_block(3, line[4:].strip()))
             i += 1
             continue
-        if lines[i].lstrip().startswith(("- ", "* ")):
-            while i < len(lines) and lines[i].lstrip().startswith(("- ", "* ")):
-                blocks.extend(bullet_blocks(lines[i].lstrip()[2:].strip()))
+        if lstripped[i].startswith(BULLET_PREFIXES):
+            while i < n and lstripped[i].startswith(BULLET_PREFIXES):
+                blocks.extend(bullet_blocks(lstripped[i][2:].strip()))
                 i += 1
             continue
         # paragraph until next blank or structural marker
-        para = [line]
         j = i + 1
-        while j < len(lines) and lines[j].strip():
-            if lines[j].startswith("## ") or lines[j].startswith("### ") or lines[j].lstrip().startswith(("- ", "* ")):
+        while j < n and rstripped[j]:
+            if lines[j].startswith(("## ", "### ")) or lstripped[j].startswith(BULLET_PREFIXES):
                 break
-            para.append(lines[j].rstrip())
             j += 1
-        blocks.extend(paragraph_blocks("\n".join(para).strip()))
+        blocks.extend(paragraph_blocks("\n".join(rstripped[i:j]).strip()))
         i = j
     return blocks
 
@@ -160,47 +212,90 @@ def load_sidecar(summary_path: str):
     for cand in (base + ".meta.json", base.replace("_summary", "") + ".meta.json"):
         if os.path.exists(cand):
             try:
-                return json.load(open(cand, "r", encoding="utf-8"))
+                return loads_json(Path(cand).read_bytes())
             except Exception:
                 pass
     return {}
 
+# ---------- database schema ----------
+
+# Title property name per database id, looked up once per process
+_TITLE_PROPS: Dict[str, str] = {}
+
+def title_property(client: Client, dbid: str):
+    """
+    Name of the database's title property (e.g. "Title" or "Name"),
+    or None if the schema could not be read.
+    """
+    if dbid not in _TITLE_PROPS:
+        try:
+            schema = notion_call(client.databases.retrieve, database_id=dbid)
+        except Exception as e:
+            print(f"⚠️  Warning: Could not read database schema: {e}")
+            return None
+        for name, prop in schema.get("properties", {}).items():
+            if prop.get("type") == "title":
+                _TITLE_PROPS[dbid] = name
+                break
+        else:
+            return None
+    return _TITLE_PROPS[dbid]
+
 # ---------- duplicate detection ----------
 
+# Existing pages per database as {(podcast, episode): page_id}, built with one
+# paginated scan and reused for INDEX_TTL seconds, so pushing many episodes
+# costs DB_size/100 queries instead of one query per episode
+INDEX_TTL = 600
+_page_index: Dict[str, tuple] = {}
+_page_index_lock = threading.Lock()
+
+def _plain_text(props: Dict, name: str) -> str:
+    try:
+        return "".join(part.get("plain_text", "") for part in props[name]["rich_text"])
+    except (KeyError, TypeError):
+        return ""
+
+def build_index(client: Client, dbid: str) -> Dict:
+    """Map (podcast, episode) to page id for every page in the database"""
+    index = {}
+    start_cursor = None
+    while True:
+        params = {"database_id": dbid, "page_size": 100}
+        if start_cursor:
+            params["start_cursor"] = start_cursor
+        results = notion_call(client.databases.query, **params)
+        for page in results.get("results", []):
+            props = page.get("properties", {})
+            key = (_plain_text(props, "Podcast"), _plain_text(props, "Episode"))
+            index.setdefault(key, page["id"])
+        if not results.get("has_more"):
+            return index
+        start_cursor = results.get("next_cursor")
+
+def _get_index(client: Client, dbid: str) -> Dict:
+    with _page_index_lock:
+        built, index = _page_index.get(dbid, (0.0, None))
+        if index is None or time.monotonic() - built > INDEX_TTL:
+            index = build_index(client, dbid)
+            _page_index[dbid] = (time.monotonic(), index)
+        return index
+
+def remember_page(dbid: str, podcast: str, episode: str, page_id: str) -> None:
+    """Add a newly created page to the cached index"""
+    with _page_index_lock:
+        if dbid in _page_index:
+            _page_index[dbid][1][(podcast, episode)] = page_id
+
 def find_existing_page(client: Client, dbid: str, podcast: str, episode: str):
     """
-    Query Notion database to check if a page with the same podcast+episode exists.
+    Check if a page with the same podcast+episode exists (cached index lookup).
     Returns the page ID if found, None otherwise.
     """
     try:
-        # Query with filters for exact match
-        results = client.databases.query(
-            database_id=dbid,
-            filter={
-                "and": [
-                    {
-                        "property": "Podcast",
-                        "rich_text": {
-                            "equals": podcast
-                        }
-                    },
-                    {
-                        "property": "Episode",
-                        "rich_text": {
-                            "equals": episode
-                        }
-                    }
-                ]
-            }
-        )
-
-        if results.get("results"):
-            # Return the first matching page ID
-            return results["results"][0]["id"]
-
-        return None
+        return _get_index(client, dbid).get((podcast, episode))
     except Exception as e:
-        # If query fails (e.g., property doesn't exist), return None
+        # If the scan fails (e.g., property doesn't exist), return None
         print(f"⚠️  Warning: Could not check for duplicates: {e}")
         return None
 
@@ -208,51 +303,72 @@ def find_existing_page(client: Client, dbid: str, podcast: str, episode: str):
 
 def create_with_batches(client: Client, dbid: str, properties: Dict, blocks: List[Dict]):
     first = blocks[:BATCH_SIZE] if blocks else []
-    page = client.pages.create(parent={"database_id": dbid}, properties=properties, children=first)
+    page = notion_call(client.pages.create, parent={"database_id": dbid}, properties=properties,
+                       children=first, idempotent=False)
     pid = page["id"]
+    # Appends go one after another: each adds to the end of the page, so
+    # concurrent batches could land out of order
     idx = BATCH_SIZE
     while idx < len(blocks):
-        client.blocks.children.append(pid, children=blocks[idx:idx+BATCH_SIZE])
+        notion_call(client.blocks.children.append, pid, children=blocks[idx:idx+BATCH_SIZE],
+                    idempotent=False)
         idx += BATCH_SIZE
     return page
 
+def _iter_child_ids(client: Client, block_id: str):
+    """Yield the id of every child block, one listing (100 children) at a time"""
+    start_cursor = None
+    while True:
+        params = {"page_size": 100}
+        if start_cursor:
+            params["start_cursor"] = start_cursor
+        listing = notion_call(client.blocks.children.list, block_id, **params)
+        for block in listing.get("results", []):
+            yield block["id"]
+        if not listing.get("has_more"):
+            return
+        start_cursor = listing.get("next_cursor")
+
 def update_with_batches(client: Client, page_id: str, properties: Dict, blocks: List[Dict]):
     """Update existing page properties and replace content"""
     # Update page properties
-    client.pages.update(page_id=page_id, properties=properties)
+    notion_call(client.pages.update, page_id=page_id, properties=properties)
 
     # Delete existing content blocks (children of the page)
     try:
-        existing_blocks = client.blocks.children.list(page_id)
-        for block in existing_blocks.get("results", []):
-            client.blocks.delete(block["id"])
+        block_ids = list(_iter_child_ids(client, page_id))
+        with ThreadPoolExecutor(max_workers=DELETE_WORKERS) as executor:
+            for _ in executor.map(lambda block_id: notion_call(client.blocks.delete, block_id),
+                                  block_ids):
+                pass
     except Exception as e:
         print(f"⚠️  Warning: Could not delete old content: {e}")
 
     # Add new content in batches
     idx = 0
     while idx < len(blocks):
-        client.blocks.children.append(page_id, children=blocks[idx:idx+BATCH_SIZE])
+        notion_call(client.blocks.children.append, page_id, children=blocks[idx:idx+BATCH_SIZE],
+                    idempotent=False)
         idx += BATCH_SIZE
 
     return {"id": page_id}
 
 # ---------- main ----------
 
-def main():
+def main(argv: List[str] = None):
     ap = argparse.ArgumentParser()
     ap.add_argument("summary_path")
     ap.add_argument("--published")  # ISO 8601 date or datetime
     ap.add_argument("--url")
     ap.add_argument("--tags", help="comma-separated")
-    args = ap.parse_args()
+    args = ap.parse_args(argv)
 
     token = os.getenv("NOTION_TOKEN")
     dbid = os.getenv("NOTION_DATABASE_ID")
     if not token or not dbid:
         raise RuntimeError("Set NOTION_TOKEN and NOTION_DATABASE_ID")
 
-    content = open(args.summary_path, "r", encoding="utf-8").read()
+    content = Path(args.summary_path).read_text(encoding="utf-8")
     podcast, episode, title = derive_meta_from_filename(args.summary_path)
 
     # merge CLI metadata with sidecar meta if present
@@ -263,7 +379,7 @@ def main():
     podcast = meta.get("podcast", podcast)
     episode = meta.get("episode", episode)
 
-    client = Client(auth=token)
+    client = get_client(token)
     blocks = md_to_blocks(content) or paragraph_blocks(content)
 
     # Check if page already exists
@@ -280,11 +396,14 @@ def main():
     if tags:
         base_props["Tags"] = {"multi_select": [{"name": t} for t in tags]}
 
+    # Use the schema's title property; without it, try "Title" then "Name"
+    title_prop = title_property(client, dbid)
+    title_props = (title_prop,) if title_prop else ("Title", "Name")
+
     # If page exists, update it instead of creating duplicate
     if existing_page_id:
-        # try with "Title" then "Name" for the title property
         last_err = None
-        for title_prop in ("Title", "Name"):
+        for title_prop in title_props:
             try:
                 props = {title_prop: {"title": [{"text": {"content": title}}]}, **base_props}
                 page = update_with_batches(client, existing_page_id, props, blocks)
@@ -294,12 +413,12 @@ def main():
                 last_err = e
         raise last_err
     else:
-        # try with "Title" then "Name" for the title property
         last_err = None
-        for title_prop in ("Title", "Name"):
+        for title_prop in title_props:
             try:
                 props = {title_prop: {"title": [{"text": {"content": title}}]}, **base_props}
                 page = create_with_batches(client, dbid, props, blocks)
+                remember_page(dbid, podcast, episode, page["id"])
                 print(f"✅ Created Notion page with {title_prop}: {page.get('id')}")
                 return
             except Exception as e:
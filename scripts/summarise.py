@@ -42,20 +42,27 @@ def summarise_with_sonnet(transcript_path: str, out_dir: str) -> str:
 
     client = anthropic.Anthropic(api_key=api_key)
 
-    print(f"Using model: {MODEL}")
-    resp = client.messages.create(
-        model=MODEL,
-        max_tokens=2000,
-        messages=[{"role": "user", "content": build_prompt(transcript)}],
-    )
-
-    summary = resp.content[0].text
-
     os.makedirs(out_dir, exist_ok=True)
     base = os.path.splitext(os.path.basename(transcript_path))[0]
     out_path = os.path.join(out_dir, base + "_summary.txt")
-    with open(out_path, "w", encoding="utf-8") as f:
-        f.write(summary)
+
+    # Stream the completion to disk as it is generated, so the summary can be
+    # followed (tail -f) instead of appearing only after the whole response
+    print(f"Using model: {MODEL}")
+    try:
+        with client.messages.stream(
+            model=MODEL,
+            max_tokens=2000,
+            messages=[{"role": "user", "content": build_prompt(transcript)}],
+        ) as stream, open(out_path, "w", encoding="utf-8") as f:
+            for text in stream.text_stream:
+                f.write(text)
+                f.flush()
+    except BaseException:
+        # Do not leave a truncated summary behind
+        if os.path.exists(out_path):
+            os.remove(out_path)
+        raise
 
     return out_path
 
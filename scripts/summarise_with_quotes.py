@@ -1,14 +1,29 @@
 import os
 import sys
-import anthropic
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 # Import our extraction modules
 sys.path.append(str(Path(__file__).parent))
 from extract_chapters import extract_chapters, format_chapters_for_summary, get_episode_duration
 
+# Make "utils" importable when run standalone
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from utils.rate_limits import create_message, get_client
+from utils.json_utils import atomic_write_json
+from utils.text_utils import chunk_lines
+
 MODEL = "claude-sonnet-4-20250514"  # Sonnet by default
 
+# Transcripts past MAP_REDUCE_CHARS (~100k tokens) are first condensed chunk by
+# chunk into notes with Haiku, and Sonnet summarises the notes; shorter ones
+# go to Sonnet whole so its quotes come straight from the transcript
+MAP_REDUCE_CHARS = int(os.getenv("SUMMARY_MAP_REDUCE_CHARS", "400000"))
+NOTES_MODEL = "claude-3-5-haiku-20241022"
+NOTES_CHUNK_CHARS = 32000  # ~8k tokens
+NOTES_MAX_TOKENS = 2000
+NOTES_WORKERS = 4
+
 def build_prompt(transcript: str) -> str:
     return (
         "You are an expert educator and editor. Produce an EDUCATIONAL summary that is easy to follow end-to-end.\n"
@@ -41,7 +56,47 @@ def build_prompt(transcript: str) -> str:
         "Transcript follows:\n\n" + transcript
     )
 
-def summarise_with_sonnet_and_quotes(transcript_path: str, out_dir: str) -> str:
+def build_notes_prompt(chunk: str, part: int, parts: int) -> str:
+    return (
+        f"This is part {part} of {parts} of a podcast transcript. Write detailed notes on it for a later summary.\n"
+        "- Bullets covering every topic discussed, in order, with names, tools, numbers and examples.\n"
+        "- Copy the 2-3 most insightful quotes word for word, formatted as: \"Exact quote\" — Speaker Name\n"
+        "Return only the notes.\n\n"
+        "Transcript part follows:\n\n" + chunk
+    )
+
+def condense_transcript(client, transcript: str, on_usage=None) -> str:
+    """
+    Map step for long transcripts: Haiku notes for every chunk, requested in
+    parallel and joined in transcript order. on_usage(model, usage) is called
+    for each response.
+    """
+    chunks = chunk_lines(transcript, NOTES_CHUNK_CHARS)
+    print(f"📝 Condensing {len(chunks)} transcript chunks with {NOTES_MODEL}...")
+
+    def notes(job):
+        part, chunk = job
+        return create_message(
+            client,
+            model=NOTES_MODEL,
+            max_tokens=NOTES_MAX_TOKENS,
+            messages=[{"role": "user", "content": build_notes_prompt(chunk, part, len(chunks))}],
+        )
+
+    with ThreadPoolExecutor(max_workers=NOTES_WORKERS) as executor:
+        responses = list(executor.map(notes, enumerate(chunks, 1)))
+
+    if on_usage:
+        for resp in responses:
+            on_usage(NOTES_MODEL, resp.usage)
+    return "\n\n".join(resp.content[0].text.strip() for resp in responses)
+
+def summarise_with_sonnet_and_quotes(transcript_path: str, out_dir: str, on_usage=None) -> str:
+    """
+    Summarise a transcript with Sonnet, adding chapters for long episodes.
+    Returns (summary path, Sonnet usage); on_usage(model, usage) receives the
+    usage of any Haiku note-taking calls made for very long transcripts.
+    """
     with open(transcript_path, "r", encoding="utf-8") as f:
         transcript = f.read()
 
@@ -59,19 +114,27 @@ def summarise_with_sonnet_and_quotes(transcript_path: str, out_dir: str) -> str:
         original_path = transcript_path.replace('_translated.txt', '.txt')
 
     duration = get_episode_duration(original_path)
-    chapters = None
-    if duration and duration >= 45:
-        print("📑 Extracting chapters...")
-        chapters = extract_chapters(transcript_path)
 
     # Step 2: Generate summary with integrated quotes
-    client = anthropic.Anthropic(api_key=api_key)
-    print(f"Using model: {MODEL}")
-    resp = client.messages.create(
-        model=MODEL,
-        max_tokens=2000,
-        messages=[{"role": "user", "content": build_prompt(transcript)}],
-    )
+    # The chapter call runs alongside it, so the two round trips overlap
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        chapters_future = None
+        if duration and duration >= 45:
+            print("📑 Extracting chapters...")
+            chapters_future = executor.submit(extract_chapters, transcript_path, duration=duration)
+
+        client = get_client(api_key)
+        if len(transcript) > MAP_REDUCE_CHARS:
+            transcript = condense_transcript(client, transcript, on_usage)
+
+        print(f"Using model: {MODEL}")
+        resp = create_message(
+            client,
+            model=MODEL,
+            max_tokens=2000,
+            messages=[{"role": "user", "content": build_prompt(transcript)}],
+        )
+        chapters = chapters_future.result() if chapters_future else None
 
     summary = resp.content[0].text
     usage = resp.usage  # Store usage for cost tracking
@@ -105,22 +168,19 @@ def summarise_with_sonnet_and_quotes(transcript_path: str, out_dir: str) -> str:
         f.write(summary)
 
     # Step 5: Save chapters separately if found
-    import json
-
     if chapters:
         chapters_path = os.path.join(out_dir, base + "_chapters.json")
-        with open(chapters_path, "w", encoding="utf-8") as f:
-            json.dump({
-                'duration_minutes': duration,
-                'chapters': chapters
-            }, f, indent=2, ensure_ascii=False)
+        atomic_write_json(chapters_path, {
+            'duration_minutes': duration,
+            'chapters': chapters
+        })
         print(f"📑 Chapters saved to: {chapters_path}")
 
     return out_path, usage
 
 # Keep original function for backward compatibility - returns tuple now
-def summarise_with_sonnet(transcript_path: str, out_dir: str):
-    return summarise_with_sonnet_and_quotes(transcript_path, out_dir)
+def summarise_with_sonnet(transcript_path: str, out_dir: str, on_usage=None):
+    return summarise_with_sonnet_and_quotes(transcript_path, out_dir, on_usage)
 
 if __name__ == "__main__":
     if len(sys.argv) < 3:
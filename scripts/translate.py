@@ -4,12 +4,40 @@ Translation script using Claude API
 Detects language and translates non-English transcripts to English
 """
 
+import hashlib
 import os
-import anthropic
+import shutil
+import sys
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from types import SimpleNamespace
 from langdetect import detect, DetectorFactory
 from langdetect.lang_detect_exception import LangDetectException
 
+try:
+    import cld3  # optional: pycld3, a much faster C++ language identifier
+except ImportError:
+    cld3 = None
+
+# Make "utils" importable when run standalone
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from utils.rate_limits import create_message, get_client
+from utils.text_utils import chunk_lines
+
+TRANSLATE_MODEL = "claude-3-5-haiku-20241022"  # Using cheaper model for translation
+# Transcripts are translated in ~4k-token pieces, requested concurrently
+# (create_message still caps in-flight requests at ANTHROPIC_CONCURRENCY)
+TRANSLATE_CHUNK_CHARS = 16000
+TRANSLATE_MAX_TOKENS = 8192
+TRANSLATE_WORKERS = 5
+
+# Finished translations keyed by a hash of the source text, so a transcript
+# saved under another name reuses its translation. Bump the version when the
+# prompt or chunking changes so old entries are no longer matched.
+TRANSLATION_CACHE_DIR = Path(__file__).resolve().parents[1] / "data" / "translations"
+TRANSLATION_CACHE_VERSION = 1
+
 # Set seed for consistent language detection
 DetectorFactory.seed = 0
 
@@ -32,32 +60,67 @@ LANGUAGE_NAMES = {
     'hi': 'Hindi'
 }
 
+# Characters per sampled window for language detection
+SAMPLE_CHARS = 500
+
+def _sample_windows(text, size=SAMPLE_CHARS):
+    """Middle, start and end windows of text, or the whole text if it is short"""
+    if len(text) <= 3 * size:
+        return [text]
+    mid = (len(text) - size) // 2
+    return [text[mid:mid + size], text[:size], text[-size:]]
+
+def _detect_sample(sample):
+    if cld3 is not None:
+        prediction = cld3.get_language(sample)
+        if prediction is not None and prediction.is_reliable:
+            return prediction.language
+    try:
+        return detect(sample)
+    except LangDetectException:
+        return 'unknown'
+
 def detect_language(text):
     """
     Detect the language of the given text
+    Votes over windows from the middle, start and end, so an English intro
+    or outro does not decide a German episode; ties go to the middle window.
     Returns language code or 'unknown' if detection fails
     """
-    try:
-        # Take a sample from middle of text for better detection
-        sample_size = min(1000, len(text))
-        start_pos = max(0, (len(text) - sample_size) // 2)
-        sample_text = text[start_pos:start_pos + sample_size]
+    return _vote(_sample_windows(text))
 
-        detected_lang = detect(sample_text)
-        return detected_lang
-    except LangDetectException:
+def _vote(samples):
+    votes = [_detect_sample(sample) for sample in samples]
+    votes = [lang for lang in votes if lang != 'unknown']
+    if not votes:
         return 'unknown'
+    return Counter(votes).most_common(1)[0][0]
 
-def translate_with_claude(text, source_lang, target_lang='en'):
+def is_english(transcript_path, sample_chars=SAMPLE_CHARS):
     """
-    Translate text using Claude API
+    Cheap pre-check so callers can skip translate_transcript (and its full
+    read) for English episodes. Seeks to the same middle, start and end
+    windows detect_language votes on, so an English intro does not decide.
     """
-    client = anthropic.Client()
-
-    source_name = LANGUAGE_NAMES.get(source_lang, source_lang)
-    target_name = LANGUAGE_NAMES.get(target_lang, target_lang)
+    window = 4 * sample_chars  # bytes; a UTF-8 character is at most 4
+    try:
+        with open(transcript_path, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            if size <= 3 * window:
+                return detect_language(f.read().decode('utf-8', errors='ignore')) == 'en'
+            samples = []
+            for offset in ((size - window) // 2, 0, size - window):
+                f.seek(offset)
+                # Cut characters split at the window edges
+                samples.append(f.read(window).decode('utf-8', errors='ignore'))
+    except OSError:
+        return False
+    mid, start, end = samples
+    cut = max(0, (len(mid) - sample_chars) // 2)
+    return _vote([mid[cut:cut + sample_chars], start[:sample_chars], end[-sample_chars:]]) == 'en'
 
-    prompt = f"""Please translate the following {source_name} text to {target_name}.
+def build_translation_prompt(text, source_name, target_name):
+    return f"""Please translate the following {source_name} text to {target_name}.
 
 Key requirements:
 - Maintain the original meaning and context
@@ -70,18 +133,53 @@ Text to translate:
 
 {text}"""
 
-    try:
-        response = client.messages.create(
-            model="claude-3-5-haiku-20241022",  # Using cheaper model for translation
-            max_tokens=32000,  # Increased for long podcasts (German episodes often 60+ min)
-            messages=[{"role": "user", "content": prompt}]
+def translate_with_claude(text, source_lang, target_lang='en'):
+    """
+    Translate text using Claude API
+    The text is split on line boundaries and the pieces are translated in
+    parallel, then joined in order. Returns (translated text, summed usage).
+    """
+    client = get_client()
+
+    source_name = LANGUAGE_NAMES.get(source_lang, source_lang)
+    target_name = LANGUAGE_NAMES.get(target_lang, target_lang)
+
+    def translate_chunk(chunk):
+        return create_message(
+            client,
+            model=TRANSLATE_MODEL,
+            max_tokens=TRANSLATE_MAX_TOKENS,
+            messages=[{"role": "user", "content": build_translation_prompt(chunk, source_name, target_name)}]
         )
+
+    try:
+        chunks = chunk_lines(text, TRANSLATE_CHUNK_CHARS)
+        with ThreadPoolExecutor(max_workers=TRANSLATE_WORKERS) as executor:
+            responses = list(executor.map(translate_chunk, chunks))
         # Return both translated text and token usage
-        return response.content[0].text.strip(), response.usage
+        usage = SimpleNamespace(
+            input_tokens=sum(r.usage.input_tokens for r in responses),
+            output_tokens=sum(r.usage.output_tokens for r in responses),
+        )
+        return "\n".join(r.content[0].text.strip() for r in responses), usage
     except Exception as e:
         print(f"Translation failed: {e}")
         return None, None
 
+def _translation_cache_path(text, source_lang):
+    h = hashlib.blake2b(digest_size=16)
+    h.update(f"{TRANSLATION_CACHE_VERSION}\0{TRANSLATE_MODEL}\0{source_lang}\0".encode("utf-8"))
+    h.update(text.encode("utf-8"))
+    return TRANSLATION_CACHE_DIR / f"{h.hexdigest()}.txt"
+
+def _link_or_copy(src, dst):
+    """Hard-link src to dst (same file system), else copy it"""
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copyfile(src, dst)
+
 def translate_transcript(transcript_path, output_dir=None):
     """
     Main function to translate a transcript if needed
@@ -124,6 +222,15 @@ def translate_transcript(transcript_path, output_dir=None):
         print(f"✅ Translation already exists: {translated_path}")
         return str(translated_path), None
 
+    cache_path = _translation_cache_path(text, detected_lang)
+    if cache_path.exists():
+        try:
+            _link_or_copy(cache_path, translated_path)
+            print(f"✅ Reusing cached translation: {translated_path}")
+            return str(translated_path), None
+        except OSError as e:
+            print(f"Could not reuse cached translation: {e}")
+
     # Translate the text
     print(f"🔄 Translating from {lang_name} to English...")
     translated_text, usage = translate_with_claude(text, detected_lang, 'en')
@@ -137,11 +244,16 @@ def translate_transcript(transcript_path, output_dir=None):
         with open(translated_path, 'w', encoding='utf-8') as f:
             f.write(translated_text)
         print(f"✅ Translation saved: {translated_path}")
-        return str(translated_path), usage
     except Exception as e:
         print(f"Error saving translation: {e}")
         return str(transcript_path), None
 
+    try:
+        _link_or_copy(translated_path, cache_path)
+    except OSError:
+        pass  # The cache is an optimization only
+    return str(translated_path), usage
+
 if __name__ == "__main__":
     import sys
     if len(sys.argv) < 2:
@@ -3,12 +3,17 @@ Cost tracking module for podcast pipeline
 Tracks API usage and costs for Whisper, Claude models
 """
 
-import json
 import os
-from datetime import datetime
+import threading
+from datetime import date, datetime
 from pathlib import Path
 from typing import Dict, Optional
 
+from utils.json_utils import atomic_write_json, loads_json
+
+DEFAULT_LOG_DIR = Path(__file__).resolve().parents[1] / "logs"
+
+
 class CostTracker:
     """Tracks and logs costs for podcast processing pipeline"""
 
@@ -27,46 +32,73 @@ class CostTracker:
         }
     }
 
+    # Prompt caching multipliers relative to the base input price
+    CACHE_READ_MULTIPLIER = 0.10   # cache hits bill at 10% of input
+    CACHE_WRITE_MULTIPLIER = 1.25  # cache writes bill at 125% of input
+
+    # Session label for untasked calls to the priced models
+    MODEL_LABELS = {
+        'claude-3-5-haiku-20241022': 'haiku',
+        'claude-sonnet-4-20250514': 'sonnet',
+    }
+
     def __init__(self, log_dir: str = None):
-        if log_dir is None:
-            log_dir = Path(__file__).parents[1] / "logs"
-        self.log_dir = Path(log_dir)
-        self.log_dir.mkdir(exist_ok=True, parents=True)
+        self.log_dir = DEFAULT_LOG_DIR if log_dir is None else Path(log_dir)
         self.cost_log = self.log_dir / "costs.log"
         self.daily_totals_file = self.log_dir / "daily_costs.json"
-        self.session_costs = []
+        # Pipeline workers share one tracker: each thread keeps its own
+        # per-episode session, file writes are serialized by the lock
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        # Parsed daily_costs.json and the (mtime_ns, size) it was read at;
+        # re-read only when another process has changed the file since
+        self._totals = None
+        self._totals_stat = None
+        # (month, cost, episodes) summed over _totals, kept current on each
+        # update so get_summary does not rescan every day in the file
+        self._month_totals = None
+
+    @property
+    def session_costs(self) -> list:
+        """Costs logged for the episode currently processed by this thread"""
+        if not hasattr(self._local, "session_costs"):
+            self._local.session_costs = []
+        return self._local.session_costs
+
+    @session_costs.setter
+    def session_costs(self, value: list):
+        self._local.session_costs = value
 
     def log_whisper_cost(self, audio_duration_minutes: float, episode_name: str = ""):
         """Log Whisper transcription cost (FREE - using local faster-whisper)"""
         cost = audio_duration_minutes * self.PRICING['whisper']['per_minute']  # $0.00
-        self._append_to_log(
-            f"Whisper: {audio_duration_minutes:.1f} min audio = ${cost:.3f} (local, free)",
-            episode_name
-        )
         self.session_costs.append(('whisper', cost))
         return cost
 
     def log_claude_cost(self, model: str, input_tokens: int, output_tokens: int,
-                       task: str = "", episode_name: str = ""):
-        """Log Claude API cost"""
+                       task: str = "", episode_name: str = "",
+                       cache_read_tokens: int = 0, cache_write_tokens: int = 0):
+        """Log Claude API cost (cache token counts come from prompt-cached requests)"""
         if model not in self.PRICING:
             # Fallback for unknown models
             model_key = 'claude-3-5-haiku-20241022'
         else:
             model_key = model
 
-        input_cost = (input_tokens / 1_000_000) * self.PRICING[model_key]['input']
-        output_cost = (output_tokens / 1_000_000) * self.PRICING[model_key]['output']
-        total_cost = input_cost + output_cost
-
-        task_label = f" ({task})" if task else ""
-        model_short = "Haiku" if "haiku" in model.lower() else "Sonnet"
-
-        self._append_to_log(
-            f"{task or model_short}: {input_tokens:,} in + {output_tokens:,} out = ${total_cost:.3f}{task_label}",
-            episode_name
-        )
-        self.session_costs.append((task or model_short.lower(), total_cost))
+        # Keep the tokens / 1M * price order: folding it into a per-token rate
+        # changes the last bit of the float stored in daily_costs.json
+        prices = self.PRICING[model_key]
+        input_price = prices['input']
+        input_cost = (input_tokens / 1_000_000) * input_price
+        output_cost = (output_tokens / 1_000_000) * prices['output']
+        cache_cost = ((cache_read_tokens * self.CACHE_READ_MULTIPLIER +
+                       cache_write_tokens * self.CACHE_WRITE_MULTIPLIER) / 1_000_000) * input_price
+        total_cost = input_cost + output_cost + cache_cost
+
+        # Individual calls are only collected; log_episode_total writes the breakdown
+        label = (task or self.MODEL_LABELS.get(model)
+                 or ("haiku" if "haiku" in model.lower() else "sonnet"))
+        self.session_costs.append((label, total_cost))
         return total_cost
 
     def log_episode_total(self, episode_name: str):
@@ -76,78 +108,89 @@ class CostTracker:
 
         total = sum(cost for _, cost in self.session_costs)
 
-        # Write detailed breakdown
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M")
-        with open(self.cost_log, 'a') as f:
-            f.write(f"\n[{timestamp}] Episode: \"{episode_name}\"\n")
-            for task, cost in self.session_costs:
-                f.write(f"  - {task}: ${cost:.3f}\n")
-            f.write(f"  TOTAL: ${total:.3f}\n")
+        with self._lock:
+            # Update daily total (atomic_write_json creates log_dir on first use)
+            running_total = self._update_daily_total(total)
 
-        # Update daily total
-        self._update_daily_total(total)
+            # Write detailed breakdown and the running total in one append
+            timestamp = datetime.now().strftime("%Y-%m-%d %H:%M")
+            lines = [f"\n[{timestamp}] Episode: \"{episode_name}\"\n"]
+            lines.extend(f"  - {task}: ${cost:.3f}\n" for task, cost in self.session_costs)
+            lines.append(f"  TOTAL: ${total:.3f}\n")
+            lines.append(running_total)
+            with open(self.cost_log, 'a') as f:
+                f.write("".join(lines))
 
         # Reset session
         self.session_costs = []
         return total
 
-    def _append_to_log(self, message: str, episode_name: str = ""):
-        """Internal method to append to cost log"""
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        # Don't write individual costs yet, collect them for episode total
-        # This is just for tracking
+    def _update_daily_total(self, amount: float) -> str:
+        """Update daily totals JSON and return the running-total line for the cost log"""
+        today = date.today().isoformat()
 
-    def _update_daily_total(self, amount: float):
-        """Update daily totals JSON"""
-        today = datetime.now().strftime("%Y-%m-%d")
-
-        # Load existing totals
-        totals = {}
-        if self.daily_totals_file.exists():
-            try:
-                with open(self.daily_totals_file, 'r') as f:
-                    totals = json.load(f)
-            except:
-                totals = {}
-
-        # Update today's total
-        if today not in totals:
-            totals[today] = {"episodes": 0, "cost": 0.0}
-
-        totals[today]["episodes"] += 1
-        totals[today]["cost"] += amount
+        # Update today's total on a copy: the cached totals only change once
+        # the save succeeds, so a failed write leaves no phantom increment
+        totals = dict(self._load_totals())
+        day = dict(totals.get(today, {"episodes": 0, "cost": 0.0}))
+        day["episodes"] += 1
+        day["cost"] += amount
+        totals[today] = day
 
         # Save back
-        with open(self.daily_totals_file, 'w') as f:
-            json.dump(totals, f, indent=2)
-
-        # Log daily total
-        with open(self.cost_log, 'a') as f:
-            f.write(f"[{today} Running Total] Episodes: {totals[today]['episodes']}, Cost: ${totals[today]['cost']:.2f}\n")
-
-    def estimate_token_count(self, text: str) -> int:
-        """Rough estimate of token count (1 token ~= 4 chars for English)"""
-        return len(text) // 4
+        self._save_totals(totals)
+        if self._month_totals and self._month_totals[0] == today[:7]:
+            month, cost, episodes = self._month_totals
+            self._month_totals = (month, cost + amount, episodes + 1)
+
+        return f"[{today} Running Total] Episodes: {totals[today]['episodes']}, Cost: ${totals[today]['cost']:.2f}\n"
+
+    def _load_totals(self) -> dict:
+        """daily_costs.json contents ({} if missing or unreadable); caller holds _lock"""
+        try:
+            st = os.stat(self.daily_totals_file)
+        except OSError:
+            self._totals = self._totals_stat = self._month_totals = None
+            return {}
+        stat_key = (st.st_mtime_ns, st.st_size)
+        if self._totals is None or stat_key != self._totals_stat:
+            try:
+                self._totals = loads_json(self.daily_totals_file.read_bytes())
+            except (OSError, ValueError):
+                self._totals = {}
+            self._totals_stat = stat_key
+            self._month_totals = None
+        return self._totals
+
+    def _save_totals(self, totals: dict):
+        """Write daily_costs.json atomically and keep it as the cached copy; caller holds _lock"""
+        atomic_write_json(self.daily_totals_file, totals)
+        st = os.stat(self.daily_totals_file)
+        self._totals = totals
+        self._totals_stat = (st.st_mtime_ns, st.st_size)
 
     def get_summary(self) -> str:
         """Get cost summary for display"""
         if not self.daily_totals_file.exists():
             return "No cost data available yet."
 
-        with open(self.daily_totals_file, 'r') as f:
-            totals = json.load(f)
-
-        # Calculate monthly total
-        current_month = datetime.now().strftime("%Y-%m")
-        monthly_total = 0
-        monthly_episodes = 0
-
-        for date_str, data in totals.items():
-            if date_str.startswith(current_month):
-                monthly_total += data["cost"]
-                monthly_episodes += data["episodes"]
+        # One clock read, so "today" and "month" agree across midnight
+        today = date.today().isoformat()
+        current_month = today[:7]
+        with self._lock:
+            totals = self._load_totals()
+
+            # Monthly total: scan once per loaded file, then maintained on update
+            if not self._month_totals or self._month_totals[0] != current_month:
+                monthly_total = 0
+                monthly_episodes = 0
+                for date_str, data in totals.items():
+                    if date_str.startswith(current_month):
+                        monthly_total += data["cost"]
+                        monthly_episodes += data["episodes"]
+                self._month_totals = (current_month, monthly_total, monthly_episodes)
+            _, monthly_total, monthly_episodes = self._month_totals
 
-        today = datetime.now().strftime("%Y-%m-%d")
         today_data = totals.get(today, {"episodes": 0, "cost": 0})
 
         return (
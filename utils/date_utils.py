@@ -4,9 +4,28 @@ Ensures all dates are in ISO 8601 format compatible with Notion
 """
 
 from datetime import datetime
+from functools import lru_cache
 import re
 
-
+# RFC 822 dates (e.g., "Thu, 21 Aug 2025 05:00:00 -0000"), with or without the
+# day name and timezone. Field patterns are the ones strptime builds for
+# '%a, %d %b %Y %H:%M:%S %z' in the C locale, so the same strings match.
+_RFC822_RE = re.compile(
+    r'(?:(?:mon|tue|wed|thu|fri|sat|sun),\s+)?'
+    r'(3[0-1]|[1-2]\d|0[1-9]|[1-9]| [1-9])\s+'
+    r'(jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)\s+'
+    r'(\d\d\d\d)\s+'
+    r'(2[0-3]|[0-1]\d|\d):([0-5]\d|\d):(6[0-1]|[0-5]\d|\d)'
+    r'(?:\s+([+-]\d\d:?[0-5]\d(?::?[0-5]\d(?:\.\d{1,6})?)?|(?-i:Z)))?',
+    re.IGNORECASE,
+)
+_MONTHS = {name: i for i, name in enumerate(
+    ('jan', 'feb', 'mar', 'apr', 'may', 'jun', 'jul', 'aug', 'sep', 'oct', 'nov', 'dec'), 1)}
+# Plain +HHMM/-HHMM offsets; anything else is validated by strptime
+_SIMPLE_OFFSET_RE = re.compile(r'[+-](?:[01]\d|2[0-3])[0-5]\d')
+
+
+@lru_cache(maxsize=1024)
 def to_iso_date(date_input: str) -> str:
     """
     Convert various date formats to ISO 8601 date format (YYYY-MM-DD).
@@ -31,32 +50,32 @@ def to_iso_date(date_input: str) -> str:
 
     date_input = date_input.strip()
 
-    # Already ISO date format (YYYY-MM-DD)
-    if re.match(r'^\d{4}-\d{2}-\d{2}$', date_input):
-        return date_input
-
-    # ISO datetime format (extract date part)
-    # Must start with YYYY-MM-DD and contain T
-    if re.match(r'^\d{4}-\d{2}-\d{2}T', date_input):
-        return date_input.split('T')[0]
+    # ISO date (YYYY-MM-DD) or datetime (YYYY-MM-DDT...), checked without the
+    # regex engine since most inputs take this path
+    if (len(date_input) >= 10 and date_input[4] == '-' and date_input[7] == '-'
+            and (len(date_input) == 10 or date_input[10] == 'T')
+            and date_input[:4].isdecimal() and date_input[5:7].isdecimal()
+            and date_input[8:10].isdecimal()):
+        return date_input[:10]
 
     # YYYYMMDD format
-    if re.match(r'^\d{8}$', date_input):
+    if len(date_input) == 8 and date_input.isdecimal():
         return f"{date_input[:4]}-{date_input[4:6]}-{date_input[6:8]}"
 
-    # RFC 822 format (e.g., "Thu, 21 Aug 2025 05:00:00 -0000")
-    # Try common RFC 822 patterns
-    for fmt in [
-        '%a, %d %b %Y %H:%M:%S %z',  # With timezone
-        '%a, %d %b %Y %H:%M:%S',      # Without timezone
-        '%d %b %Y %H:%M:%S %z',       # Without day name
-        '%d %b %Y %H:%M:%S',          # Minimal
-    ]:
+    # RFC 822 format
+    m = _RFC822_RE.fullmatch(date_input)
+    if m:
+        day, month, year, hour, minute, second, offset = m.groups()
         try:
-            dt = datetime.strptime(date_input, fmt)
-            return dt.strftime('%Y-%m-%d')
+            # Rejects days past the end of the month and leap seconds, as strptime does
+            dt = datetime(int(year), _MONTHS[month.lower()], int(day),
+                          int(hour), int(minute), int(second))
+            if offset and offset != 'Z' and not _SIMPLE_OFFSET_RE.fullmatch(offset):
+                datetime.strptime(offset, '%z')
         except ValueError:
-            continue
+            pass
+        else:
+            return dt.strftime('%Y-%m-%d')
 
     # If all else fails, raise error
     raise ValueError(f"Unrecognized date format: {date_input}")
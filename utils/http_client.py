@@ -0,0 +1,29 @@
+"""
+Shared HTTP session for the podcast pipeline
+Reuses pooled keep-alive connections across feed fetches and audio downloads
+and retries GETs that fail to connect or hit a transient gateway error
+"""
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Enough pooled connections per host for all pipeline worker threads
+POOL_SIZE = 32
+
+# Retried before any body is read; the final 5xx response is still returned
+# so callers' raise_for_status behaves as before
+RETRY = Retry(
+    total=3,
+    backoff_factor=1,
+    status_forcelist=[502, 503, 504],
+    allowed_methods={"GET"},
+    raise_on_status=False,
+)
+
+session = requests.Session()
+session.headers["User-Agent"] = "Mozilla/5.0"
+
+_adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE, max_retries=RETRY)
+session.mount("http://", _adapter)
+session.mount("https://", _adapter)
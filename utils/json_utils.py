@@ -0,0 +1,65 @@
+"""
+JSON helpers for pipeline state and metadata files
+Uses orjson when installed and writes files atomically
+"""
+
+import json
+import os
+import tempfile
+from functools import lru_cache
+from pathlib import Path
+
+try:
+    import orjson  # optional: faster JSON encode/decode
+except ImportError:
+    orjson = None
+
+
+def loads_json(data):
+    """Parse JSON from bytes or str"""
+    if orjson:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+@lru_cache(maxsize=4)
+def _load_json_file(path: str, mtime_ns: int, size: int):
+    return loads_json(Path(path).read_bytes())
+
+
+def load_json_file(path):
+    """
+    Parse a JSON file, memoized on its mtime and size so repeated reads of an
+    unchanged file (e.g. several evals in one runner process) parse it once.
+    The result is shared between callers and must not be mutated.
+    """
+    st = os.stat(path)
+    return _load_json_file(str(path), st.st_mtime_ns, st.st_size)
+
+
+def dumps_json(obj, indent: bool = True) -> bytes:
+    """Serialize to UTF-8 JSON bytes, 2-space indented unless indent=False"""
+    if orjson:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+    if indent:
+        return json.dumps(obj, indent=2, ensure_ascii=False).encode("utf-8")
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def atomic_write_json(path, obj, indent: bool = True) -> None:
+    """
+    Write JSON to path via a temp file in the same directory + os.replace,
+    so readers and concurrent writers never see a half-written file
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    data = dumps_json(obj, indent=indent)
+
+    with tempfile.NamedTemporaryFile(dir=path.parent, prefix=path.name + ".", suffix=".tmp",
+                                     delete=False) as tmp:
+        tmp.write(data)
+    try:
+        os.replace(tmp.name, path)
+    except BaseException:
+        os.unlink(tmp.name)
+        raise
@@ -0,0 +1,61 @@
+"""
+Shared API concurrency limits for the podcast pipeline
+Keeps parallel feed workers within Anthropic rate limits
+"""
+
+import os
+import random
+import threading
+import time
+
+import anthropic
+
+# Max number of in-flight Claude requests across all pipeline workers
+ANTHROPIC_CONCURRENCY = int(os.getenv("ANTHROPIC_CONCURRENCY", "2"))
+
+# Acquire around every client.messages.create call:
+#   with anthropic_slot:
+#       resp = client.messages.create(...)
+anthropic_slot = threading.BoundedSemaphore(ANTHROPIC_CONCURRENCY)
+
+# Attempts per request when the API keeps answering 429
+RATE_LIMIT_ATTEMPTS = 3
+
+# One Anthropic client per API key, shared by all calls and worker threads in
+# the process so its pooled HTTPS connections stay warm
+_CLIENTS = {}
+_CLIENTS_LOCK = threading.Lock()
+
+
+def get_client(api_key: str = None) -> anthropic.Anthropic:
+    """Shared client for api_key (None: ANTHROPIC_API_KEY from the environment)"""
+    with _CLIENTS_LOCK:
+        if api_key not in _CLIENTS:
+            _CLIENTS[api_key] = anthropic.Anthropic(api_key=api_key)
+        return _CLIENTS[api_key]
+
+
+def retry_delay(error: anthropic.RateLimitError, attempt: int) -> float:
+    """Seconds to wait: the server's Retry-After if given, else capped exponential backoff with jitter"""
+    try:
+        retry_after = float(error.response.headers.get("retry-after", 0))
+    except (AttributeError, TypeError, ValueError):
+        retry_after = 0
+    return retry_after or min(60, 2 ** attempt + random.random())
+
+
+def create_message(client, **kwargs):
+    """
+    client.messages.create under anthropic_slot, retrying on 429.
+    The slot is released while sleeping so other workers can proceed.
+    """
+    for attempt in range(1, RATE_LIMIT_ATTEMPTS + 1):
+        try:
+            with anthropic_slot:
+                return client.messages.create(**kwargs)
+        except anthropic.RateLimitError as e:
+            if attempt == RATE_LIMIT_ATTEMPTS:
+                raise
+            sleep_s = retry_delay(e, attempt)
+            print(f"Rate limited, retry {attempt}/{RATE_LIMIT_ATTEMPTS - 1} after {sleep_s:.1f}s")
+            time.sleep(sleep_s)
@@ -0,0 +1,34 @@
+"""
+On-disk cache of Claude response text (data/claude_cache/<key>.json)
+For helper calls whose output depends only on model, max_tokens and prompt
+(chapter titles, quotes), so re-running an episode skips the API call
+"""
+
+import hashlib
+from pathlib import Path
+
+from utils.json_utils import atomic_write_json, loads_json
+
+CACHE_DIR = Path(__file__).resolve().parents[1] / "data" / "claude_cache"
+
+
+def _cache_path(model: str, max_tokens: int, prompt: str) -> Path:
+    h = hashlib.blake2b(digest_size=16)
+    h.update(f"{model}\0{max_tokens}\0".encode("utf-8"))
+    h.update(prompt.encode("utf-8"))
+    return CACHE_DIR / f"{h.hexdigest()}.json"
+
+
+def load_response(model: str, max_tokens: int, prompt: str):
+    """Cached response text for this request, or None"""
+    try:
+        return loads_json(_cache_path(model, max_tokens, prompt).read_bytes())["text"]
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def save_response(model: str, max_tokens: int, prompt: str, text: str) -> None:
+    try:
+        atomic_write_json(_cache_path(model, max_tokens, prompt), {"model": model, "text": text})
+    except OSError:
+        pass  # The cache is an optimization only
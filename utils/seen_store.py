@@ -0,0 +1,135 @@
+"""
+SQLite store for processed episode ids (data/seen.sqlite)
+Membership checks and inserts touch one row instead of rewriting seen.json;
+an existing seen.json is imported once, in the same transaction that records
+the import in PRAGMA user_version
+"""
+
+import sqlite3
+import time
+from pathlib import Path
+
+from utils.json_utils import loads_json
+
+SEEN_DB_NAME = "seen.sqlite"
+LEGACY_JSON_NAME = "seen.json"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS seen (
+    feed TEXT NOT NULL,
+    episode_id TEXT NOT NULL,
+    ts INTEGER NOT NULL,
+    PRIMARY KEY (feed, episode_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS seen_feed_ts ON seen (feed, ts);
+"""
+# PRAGMA user_version once seen.json (if any) has been imported
+MIGRATED_VERSION = 1
+
+
+def open_seen_db(data_dir, create: bool = True):
+    """
+    Open data_dir/seen.sqlite, creating it and importing seen.json if needed.
+    An import that was interrupted or failed (e.g. unparsable seen.json) is
+    retried on the next open rather than leaving an empty database behind.
+
+    With create=False nothing is written: returns a read-only connection, an
+    in-memory copy when seen.json has not been imported yet, or None when
+    neither file exists.
+    The connection may be shared between threads; callers serialize writes.
+    """
+    data_dir = Path(data_dir)
+    db_path = data_dir / SEEN_DB_NAME
+    legacy_path = data_dir / LEGACY_JSON_NAME
+    if not create:
+        return _open_readonly(db_path, legacy_path)
+
+    data_dir.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(db_path, check_same_thread=False)
+    try:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(_SCHEMA)
+        if _user_version(conn) < MIGRATED_VERSION:
+            _import_legacy_json(conn, legacy_path)
+    except BaseException:
+        conn.close()
+        raise
+    return conn
+
+
+def _open_readonly(db_path: Path, legacy_path: Path):
+    """open_seen_db(create=False): leave creating and migrating to the pipeline"""
+    rows = []
+    if db_path.exists():
+        conn = sqlite3.connect(f"{db_path.resolve().as_uri()}?mode=ro", uri=True,
+                               check_same_thread=False)
+        if _user_version(conn) >= MIGRATED_VERSION or not legacy_path.exists():
+            return conn
+        rows = conn.execute("SELECT feed, episode_id, ts FROM seen").fetchall()
+        conn.close()
+    elif not legacy_path.exists():
+        return None
+
+    # seen.json is not imported yet: merge it with any rows already in
+    # seen.sqlite in a private in-memory database
+    conn = sqlite3.connect(":memory:", check_same_thread=False)
+    conn.executescript(_SCHEMA)
+    conn.executemany("INSERT OR IGNORE INTO seen VALUES (?, ?, ?)", rows)
+    _import_legacy_json(conn, legacy_path)
+    return conn
+
+
+def _user_version(conn: sqlite3.Connection) -> int:
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def _import_legacy_json(conn: sqlite3.Connection, legacy_path: Path) -> None:
+    """
+    One-shot migration from {feed: {episode_id: true}} or {feed: [ids]}.
+    The rows and user_version commit together, so a crash mid-import leaves
+    the migration pending rather than marked done.
+    """
+    rows = []
+    if legacy_path.exists():
+        raw = loads_json(legacy_path.read_bytes())
+        # File order is processing order; small ordinals sort before real timestamps
+        rows = [
+            (feed, str(episode_id), i)
+            for feed, ids in raw.items()
+            for i, episode_id in enumerate(ids)
+        ]
+    with conn:
+        conn.executemany("INSERT OR IGNORE INTO seen VALUES (?, ?, ?)", rows)
+        conn.execute(f"PRAGMA user_version = {MIGRATED_VERSION}")
+
+
+def is_seen(conn: sqlite3.Connection, feed: str, episode_id: str) -> bool:
+    row = conn.execute(
+        "SELECT 1 FROM seen WHERE feed = ? AND episode_id = ?", (feed, episode_id)
+    ).fetchone()
+    return row is not None
+
+
+def mark_seen(conn: sqlite3.Connection, feed: str, episode_id: str) -> None:
+    with conn:
+        conn.execute(
+            "INSERT OR IGNORE INTO seen VALUES (?, ?, ?)", (feed, episode_id, time.time_ns())
+        )
+
+
+def feed_status(conn: sqlite3.Connection, feed: str):
+    """Return (processed_count, latest_episode_id) for one feed"""
+    count = conn.execute("SELECT COUNT(*) FROM seen WHERE feed = ?", (feed,)).fetchone()[0]
+    latest = conn.execute(
+        "SELECT episode_id FROM seen WHERE feed = ? ORDER BY ts DESC LIMIT 1", (feed,)
+    ).fetchone()
+    return count, latest[0] if latest else None
+
+
+def load_all(conn: sqlite3.Connection) -> dict:
+    """Return {feed: [episode_id, ...]} with ids in processing order"""
+    seen = {}
+    for feed, episode_id in conn.execute("SELECT feed, episode_id FROM seen ORDER BY feed, ts"):
+        seen.setdefault(feed, []).append(episode_id)
+    return seen
@@ -0,0 +1,20 @@
+"""
+Text helpers for splitting transcripts into request-sized pieces
+"""
+
+
+def chunk_lines(text: str, size: int) -> list:
+    """
+    Split text into chunks of about size characters on line boundaries,
+    so transcript lines (and their timestamps) are never cut
+    """
+    chunks, current, length = [], [], 0
+    for line in text.splitlines(keepends=True):
+        if current and length + len(line) > size:
+            chunks.append("".join(current))
+            current, length = [], 0
+        current.append(line)
+        length += len(line)
+    if current:
+        chunks.append("".join(current))
+    return chunks